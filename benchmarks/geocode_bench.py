@@ -0,0 +1,106 @@
+"""
+/address 좌표 검색 벤치마크
+
+기존 방식(주소마다 requests.get 을 순서대로 호출)과 새 방식(공용 httpx.AsyncClient 로 동시에 호출)을
+로컬 가짜 카카오 서버에 대해 비교합니다. 외부 API 는 호출하지 않습니다.
+
+    python benchmarks/geocode_bench.py --results 10 --latency 0.05 --rounds 30
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+
+import httpx
+import requests
+
+LATENCY = 0.05
+
+class FakeKakaoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        body = json.dumps({"documents": [{"address": {"x": "127.0", "y": "37.5"}}]}).encode()
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class FakeKakaoServer(ThreadingHTTPServer):
+    # 동시 연결이 몰려도 listen 큐가 넘치지 않게 합니다.
+    request_queue_size = 128
+
+def serial(url: str, addresses: list):
+    points = []
+
+    for address in addresses:
+        response = requests.get(url, params={"query": address})
+        info = response.json()['documents'][0]['address']
+        points.append((float(info['y']), float(info['x'])))
+
+    return points
+
+async def concurrent(client: httpx.AsyncClient, url: str, addresses: list):
+    async def geocode(address):
+        response = await client.get(url, params={"query": address}, timeout=2)
+        info = response.json()['documents'][0]['address']
+        return float(info['y']), float(info['x'])
+
+    return await asyncio.gather(*[geocode(address) for address in addresses])
+
+def report(name: str, samples: list):
+    samples = sorted(samples)
+    p50 = statistics.median(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<12} p50={p50 * 1000:8.1f}ms  p95={p95 * 1000:8.1f}ms")
+
+async def main():
+    global LATENCY
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--results", type=int, default=10, help="주소 검색 결과 수 (juso countPerPage)")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 카카오 서버 응답 지연 (초)")
+    parser.add_argument("--rounds", type=int, default=30)
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+
+    server = FakeKakaoServer(("127.0.0.1", 0), FakeKakaoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v2/local/search/address.json"
+
+    addresses = [f"서울특별시 테스트동 {i}" for i in range(args.results)]
+
+    serial_samples = []
+
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        serial(url, addresses)
+        serial_samples.append(time.perf_counter() - started)
+
+    concurrent_samples = []
+
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)) as client:
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            await concurrent(client, url, addresses)
+            concurrent_samples.append(time.perf_counter() - started)
+
+    server.shutdown()
+
+    print(f"results={args.results} latency={args.latency * 1000:.0f}ms rounds={args.rounds}")
+    report("serial", serial_samples)
+    report("concurrent", concurrent_samples)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,128 @@
+"""
+로그인 비밀번호 해시 처리량 벤치마크
+
+로그인 --logins 건을 동시에 처리할 때의 처리량과, 그동안 이벤트 루프가 얼마나 멈추는지(다른 요청 지연)를 비교합니다.
+
+    thread: 기존 방식처럼 스레드풀에서 sha256_crypt 계산 (asyncio.to_thread)
+    process(N): password_hasher 의 프로세스 풀, 워커 N 개 (1 부터 코어 수까지)
+    web(W x N): uvicorn 워커 W 개가 각자 워커 N 개짜리 풀을 가진 경우 (--web-workers 가 2 이상일 때)
+                워커마다 코어 수만큼 띄우던 예전 기본값과 코어를 W 로 나눈 지금 기본값을 비교합니다.
+
+    python benchmarks/password_hash_bench.py --logins 32
+    python benchmarks/password_hash_bench.py --logins 32 --web-workers 4
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils import password_hasher
+
+async def measure_stall(stop: asyncio.Event, delays: list, interval: float = 0.01):
+    # 지도 조회 같은 가벼운 요청 대신 interval 마다 깨어나는 코루틴의 지연을 잽니다.
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        delays.append(time.perf_counter() - started - interval)
+
+async def run(name: str, hash_one, logins: int):
+    stop = asyncio.Event()
+    delays = []
+    ticker = asyncio.create_task(measure_stall(stop, delays))
+
+    started = time.perf_counter()
+    await asyncio.gather(*[hash_one(f"password-{i}") for i in range(logins)])
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await ticker
+    delays.sort()
+
+    print(
+        f"{name:12s} logins={logins} {logins / elapsed:6.1f} logins/s "
+        f"loop delay p50={statistics.median(delays) * 1000:.1f}ms max={delays[-1] * 1000:.1f}ms"
+    )
+
+def _configure(workers: int):
+    password_hasher.shutdown()
+    password_hasher.PASSWORD_HASH_WORKERS = workers
+    password_hasher.PASSWORD_HASH_MAX_CONCURRENCY = workers * 2
+    password_hasher._semaphore = None
+
+async def _web_worker(pool_workers: int, logins: int, barrier, results):
+    _configure(pool_workers)
+
+    # 워커 프로세스를 띄우는 시간은 재지 않습니다.
+    password_hasher.start()
+    await asyncio.gather(*[password_hasher.hash_password("warm-up") for _ in range(pool_workers)])
+
+    # 모든 uvicorn 워커가 같은 순간에 로그인을 받기 시작하도록 맞춥니다.
+    await asyncio.to_thread(barrier.wait)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[password_hasher.hash_password(f"password-{i}") for i in range(logins)])
+    results.put(time.perf_counter() - started)
+
+    password_hasher.shutdown()
+
+def web_worker(pool_workers: int, logins: int, barrier, results):
+    asyncio.run(_web_worker(pool_workers, logins, barrier, results))
+
+def run_web(web_workers: int, pool_workers: int, logins: int):
+    """uvicorn 워커 web_workers 개가 각자 풀을 가지고 로그인 logins 건씩 동시에 처리합니다."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(web_workers)
+    results = context.Queue()
+    processes = [context.Process(target=web_worker, args=(pool_workers, logins, barrier, results)) for _ in range(web_workers)]
+
+    for process in processes:
+        process.start()
+
+    elapsed = [results.get() for _ in processes]
+
+    for process in processes:
+        process.join()
+
+    print(
+        f"web({web_workers}x{pool_workers}) processes={web_workers * pool_workers} "
+        f"{web_workers * logins / max(elapsed):6.1f} logins/s slowest worker={max(elapsed) * 1000:.0f}ms"
+    )
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--web-workers", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"cpu_count={os.cpu_count()}")
+
+    await run("thread", lambda password: asyncio.to_thread(password_hasher.hash_password_sync, password), args.logins)
+
+    counts = sorted({*[2 ** i for i in range(args.max_workers.bit_length()) if 2 ** i <= args.max_workers], args.max_workers})
+
+    for workers in counts:
+        _configure(workers)
+
+        # 워커 프로세스를 띄우는 시간은 재지 않습니다.
+        password_hasher.start()
+        await asyncio.gather(*[password_hasher.hash_password("warm-up") for _ in range(workers)])
+
+        await run(f"process({workers})", password_hasher.hash_password, args.logins)
+
+    password_hasher.shutdown()
+
+    if args.web_workers > 1:
+        cpu_count = os.cpu_count() or 1
+
+        # 예전 기본값 (워커마다 코어 수만큼) / 지금 기본값 (코어를 워커 수로 나눔)
+        for pool_workers in sorted({cpu_count, max(1, cpu_count // args.web_workers)}, reverse=True):
+            await asyncio.to_thread(run_web, args.web_workers, pool_workers, args.logins)
+
+if __name__ == "__main__":
+    asyncio.run(main())
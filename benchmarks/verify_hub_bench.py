@@ -0,0 +1,135 @@
+"""
+이메일 인증 알림 팬아웃 벤치마크
+
+대기 중인 웹소켓 클라이언트를 --clients 개 띄워 두고, 인증 요청(동기 엔드포인트)마다 알림을 보내는 두 방식을 비교합니다.
+
+    hub:    요청 스레드에서 프로세스 안의 허브로 넘기고 바로 응답 (verify_hub.publish_threadsafe)
+    socket: 기존 방식처럼 요청마다 새 웹소켓 클라이언트로 소켓 서버에 연결해 보내고 끊음
+
+소켓 서버 역할도 API 서버(자식 프로세스)의 /relay 엔드포인트가 하므로 외부 서버는 필요 없습니다.
+
+    python benchmarks/verify_hub_bench.py --clients 1000 --concurrency 50
+"""
+from fastapi import FastAPI, WebSocket
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import httpx
+import uvicorn
+import websocket
+import websockets
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.utils.verify_hub import hub
+
+PORT = 18765
+app = FastAPI()
+
+@app.websocket("/verify/email/ws/{token}")
+async def wait_email_verify(ws: WebSocket, token: str):
+    await hub.wait(ws, token)
+
+@app.websocket("/relay")
+async def relay(ws: WebSocket):
+    await ws.accept()
+    token = await ws.receive_text()
+    await hub.publish(token, {"event": "verified", "email": token})
+
+@app.get("/waiting")
+def waiting(prefix: str):
+    return {"count": sum(hub.is_waiting(f"{prefix}-{i}") for i in range(100000))}
+
+@app.post("/publish/hub/{token}")
+def publish_hub(token: str):
+    hub.publish_threadsafe(token, {"event": "verified", "email": token})
+    return {"ok": True}
+
+@app.post("/publish/socket/{token}")
+def publish_socket(token: str):
+    conn = websocket.create_connection(f"ws://127.0.0.1:{PORT}/relay", timeout=10)
+    conn.send(token)
+    conn.close()
+    return {"ok": True}
+
+def serve():
+    uvicorn.run(app, port=PORT, log_level="warning", backlog=4096)
+
+def start_server():
+    # 클라이언트와 GIL 을 나눠 쓰지 않도록 서버는 자식 프로세스에서 띄웁니다.
+    process = multiprocessing.Process(target=serve, daemon=True)
+    process.start()
+
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/waiting", params={"prefix": "-"})
+            return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+
+async def run(mode: str, clients: int, concurrency: int):
+    tokens = [f"{mode}-{i}" for i in range(clients)]
+    received = {}
+
+    async def waiter(token, ready):
+        async with websockets.connect(f"ws://127.0.0.1:{PORT}/verify/email/ws/{token}", max_queue=1) as ws:
+            ready.set()
+            await ws.recv()
+            received[token] = time.perf_counter()
+
+    events = [asyncio.Event() for _ in tokens]
+    waiters = [asyncio.create_task(waiter(token, event)) for token, event in zip(tokens, events)]
+    await asyncio.gather(*[event.wait() for event in events])
+
+    # 허브에 구독이 모두 등록될 때까지 기다립니다.
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}") as client:
+        while (await client.get("/waiting", params={"prefix": mode})).json()["count"] < clients:
+            await asyncio.sleep(0.05)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    sent = {}
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def publish(token):
+            async with semaphore:
+                started = time.perf_counter()
+                sent[token] = started
+                await client.post(f"/publish/{mode}/{token}")
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*[publish(token) for token in tokens])
+        await asyncio.gather(*waiters)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    delivery = sorted(received[token] - sent[token] for token in tokens)
+
+    print(
+        f"{mode:6s} clients={clients} total={elapsed:.2f}s "
+        f"request p50={statistics.median(latencies) * 1000:.1f}ms p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms "
+        f"delivery p50={statistics.median(delivery) * 1000:.1f}ms p99={delivery[int(len(delivery) * 0.99) - 1] * 1000:.1f}ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    process = start_server()
+
+    for mode in ("socket", "hub"):
+        asyncio.run(run(mode, args.clients, args.concurrency))
+
+    process.terminate()
+
+if __name__ == "__main__":
+    main()
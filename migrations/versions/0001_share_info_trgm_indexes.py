@@ -0,0 +1,48 @@
+"""share_info 이름/주소 컬럼에 pg_trgm GIN 인덱스 추가
+
+Revision ID: 0001_share_info_trgm_indexes
+Revises: 
+Create Date: 2026-10-18 07:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_share_info_trgm_indexes'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_COLUMNS = ['name', 'point_name', 'jibun_address', 'doro_address']
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # 운영 중인 테이블을 잠그지 않도록 CONCURRENTLY 로 생성합니다.
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.create_index(
+                f'ix_share_info_{column}_trgm',
+                'share_info',
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.drop_index(
+                f'ix_share_info_{column}_trgm',
+                table_name='share_info',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
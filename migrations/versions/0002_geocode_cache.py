@@ -0,0 +1,33 @@
+"""지번 주소 좌표 캐시 테이블 geocode_cache 추가
+
+Revision ID: 0002_geocode_cache
+Revises: 0001_share_info_trgm_indexes
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_geocode_cache'
+down_revision: Union[str, None] = '0001_share_info_trgm_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'geocode_cache',
+        sa.Column('address', sa.String(), primary_key=True),
+        sa.Column('lat', sa.Float(), nullable=False),
+        sa.Column('lng', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('geocode_cache', if_exists=True)
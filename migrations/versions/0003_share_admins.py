@@ -0,0 +1,42 @@
+"""share_info.admins 문자열을 share_admins 테이블로 분리
+
+Revision ID: 0003_share_admins
+Revises: 0002_geocode_cache
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_share_admins'
+down_revision: Union[str, None] = '0002_geocode_cache'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'share_admins',
+        sa.Column('share_id', sa.Integer(), primary_key=True),
+        sa.Column('user_tag', sa.Integer(), primary_key=True),
+        if_not_exists=True,
+    )
+    op.create_index('ix_share_admins_user_tag_share_id', 'share_admins', ['user_tag', 'share_id'], if_not_exists=True)
+
+    # 기존 "1,2,3" 문자열에서 채웁니다. 숫자가 아닌 값은 건너뜁니다.
+    op.execute("""
+        INSERT INTO share_admins (share_id, user_tag)
+        SELECT DISTINCT share_info.id, trim(admin_tag)::integer
+        FROM share_info, unnest(string_to_array(share_info.admins, ',')) AS admin_tag
+        WHERE trim(admin_tag) ~ '^[0-9]+$'
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_share_admins_user_tag_share_id', table_name='share_admins', if_exists=True)
+    op.drop_table('share_admins', if_exists=True)
@@ -0,0 +1,69 @@
+"""starred_share 중복 제거 후 (user_id, share_id) 유니크 인덱스 추가
+
+Revision ID: 0004_starred_share_unique
+Revises: 0003_share_admins
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_starred_share_unique'
+down_revision: Union[str, None] = '0003_share_admins'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 중복 제거와 인덱스 생성 사이에 새 중복이 들어오지 않도록 같은 트랜잭션에서 쓰기를 막고 진행합니다.
+    # (CONCURRENTLY 로 따로 만들면 그사이 들어온 중복 때문에 INVALID 인덱스가 남을 수 있습니다)
+    # starred_share 는 작은 테이블이라 인덱스를 만드는 동안만 즐겨찾기 쓰기가 잠깐 기다립니다.
+    op.execute("LOCK TABLE starred_share IN SHARE ROW EXCLUSIVE MODE")
+
+    # 예전에 CONCURRENTLY 로 만들다 실패해 남은 INVALID 인덱스가 있으면 지우고 다시 만듭니다.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1
+                FROM pg_index
+                JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+                WHERE pg_class.relname = 'ux_starred_share_user_id_share_id'
+                  AND NOT pg_index.indisvalid
+            ) THEN
+                DROP INDEX ux_starred_share_user_id_share_id;
+            END IF;
+        END
+        $$
+    """)
+
+    # 같은 유저가 같은 나눔을 여러 번 즐겨찾기한 경우 가장 먼저 들어간 row 만 남깁니다.
+    op.execute("""
+        DELETE FROM starred_share
+        USING starred_share AS kept
+        WHERE starred_share.user_id = kept.user_id
+          AND starred_share.share_id = kept.share_id
+          AND starred_share.id > kept.id
+    """)
+
+    op.create_index(
+        'ux_starred_share_user_id_share_id',
+        'starred_share',
+        ['user_id', 'share_id'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ux_starred_share_user_id_share_id',
+            table_name='starred_share',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,45 @@
+"""share_info.version 컬럼과 수정 시 version 을 올리는 트리거 추가
+
+Revision ID: 0005_share_info_version
+Revises: 0004_starred_share_unique
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_share_info_version'
+down_revision: Union[str, None] = '0004_starred_share_unique'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('share_info', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+    # ORM / Core update 어느 쪽으로 수정해도 version 이 바뀌도록 트리거로 올립니다.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION share_info_bump_version() RETURNS trigger AS $$
+        BEGIN
+            IF NEW IS DISTINCT FROM OLD THEN
+                NEW.version := OLD.version + 1;
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER share_info_bump_version
+        BEFORE UPDATE ON share_info
+        FOR EACH ROW EXECUTE FUNCTION share_info_bump_version()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS share_info_bump_version ON share_info")
+    op.execute("DROP FUNCTION IF EXISTS share_info_bump_version()")
+    op.drop_column('share_info', 'version')
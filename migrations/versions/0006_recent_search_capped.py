@@ -0,0 +1,104 @@
+"""recent_search_keywords 중복 제거와 유저당 최근 20개로 자르기, (user_id, keyword) 유니크 / (user_id, created_at DESC) 인덱스 추가
+
+Revision ID: 0006_recent_search_capped
+Revises: 0005_share_info_version
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_recent_search_capped'
+down_revision: Union[str, None] = '0005_share_info_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# src/utils/recent_search.py 의 RECENT_SEARCH_LIMIT 기본값과 같게 둡니다.
+RECENT_SEARCH_LIMIT = 20
+
+
+def upgrade() -> None:
+    # 중복 제거와 유니크 인덱스 생성 사이에 (아직 배포 전 버전의 서버가) 새 중복을 넣지 않도록
+    # 같은 트랜잭션에서 쓰기를 막고 진행합니다. CONCURRENTLY 로 따로 만들면 INVALID 인덱스가 남을 수 있습니다.
+    op.execute("LOCK TABLE recent_search_keywords IN SHARE ROW EXCLUSIVE MODE")
+
+    # 예전에 CONCURRENTLY 로 만들다 실패해 남은 INVALID 인덱스가 있으면 지우고 다시 만듭니다.
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (
+                SELECT 1
+                FROM pg_index
+                JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+                WHERE pg_class.relname = 'ux_recent_search_keywords_user_id_keyword'
+                  AND NOT pg_index.indisvalid
+            ) THEN
+                DROP INDEX ux_recent_search_keywords_user_id_keyword;
+            END IF;
+        END
+        $$
+    """)
+
+    # 같은 유저의 같은 키워드는 가장 최근 row 만 남기고, 유저마다 최근 RECENT_SEARCH_LIMIT 개만 남깁니다.
+    op.execute("""
+        DELETE FROM recent_search_keywords
+        USING (
+            SELECT id
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY user_id, keyword ORDER BY created_at DESC, id DESC) AS keyword_rank
+                FROM recent_search_keywords
+            ) ranked
+            WHERE keyword_rank > 1
+        ) duplicated
+        WHERE recent_search_keywords.id = duplicated.id
+    """)
+    op.execute(f"""
+        DELETE FROM recent_search_keywords
+        USING (
+            SELECT id
+            FROM (
+                SELECT id, row_number() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS recent_rank
+                FROM recent_search_keywords
+            ) ranked
+            WHERE recent_rank > {RECENT_SEARCH_LIMIT}
+        ) overflowed
+        WHERE recent_search_keywords.id = overflowed.id
+    """)
+
+    op.create_index(
+        'ux_recent_search_keywords_user_id_keyword',
+        'recent_search_keywords',
+        ['user_id', 'keyword'],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    # 중복과 상관없는 일반 인덱스는 쓰기를 막지 않도록 커밋 후 CONCURRENTLY 로 만듭니다.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_recent_search_keywords_user_id_created_at',
+            'recent_search_keywords',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_recent_search_keywords_user_id_created_at',
+            table_name='recent_search_keywords',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ux_recent_search_keywords_user_id_keyword',
+            table_name='recent_search_keywords',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
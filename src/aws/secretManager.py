@@ -1,11 +1,16 @@
 import boto3
 from botocore.exceptions import ClientError
 
+import asyncio
 import os
 import logging
+import threading
+import time
 
 import json
 
+from src.utils import metrics
+
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -13,29 +18,67 @@ logger = logging.getLogger(__name__)
 aws_access_key_id = os.getenv('AWS_ACCESS_KEY_ID')
 aws_secret_access_key = os.getenv('AWS_SECRET_ACCESS_KEY')
 
-def get_secret(secret_name:str):
-    region_name = "ap-northeast-2"
+region_name = "ap-northeast-2"
 
-    # Create a Secrets Manager client
-    session = boto3.session.Session()
+# 시크릿 캐시 설정 (초 단위)
+SECRET_CACHE_TTL = float(os.getenv('SECRET_CACHE_TTL') or 3600)
+SECRET_CACHE_REFRESH_AHEAD = float(os.getenv('SECRET_CACHE_REFRESH_AHEAD') or 300)
+# 만료 후 갱신에 실패하면 이 시간 동안은 다시 조회하지 않고 마지막 값을 씁니다.
+SECRET_CACHE_STALE_BACKOFF = float(os.getenv('SECRET_CACHE_STALE_BACKOFF') or 30)
 
-    client = None
+_client = None
+_client_lock = threading.Lock()
 
-    if aws_access_key_id and aws_secret_access_key:
-        client = session.client(
-            service_name='secretsmanager',
-            region_name=region_name,
-            aws_access_key_id=aws_access_key_id, 
-            aws_secret_access_key=aws_secret_access_key
-        )
-    else: 
-        client = session.client(
-            service_name='secretsmanager',
-            region_name=region_name,
-        )
+_cache = {}
+_cache_lock = threading.Lock()
+_fetch_locks = {}
+
+lookups = metrics.counter(
+    "secret_cache_lookups_total",
+    "Secret lookups by how they were answered (hit, miss, stale)",
+    ("result",)
+)
+refreshes = metrics.counter("secret_cache_refreshes_total", "Background refresh-ahead fetches of cached secrets", ("result",))
+cache_size = metrics.gauge("secret_cache_size", "Secrets held in the in-process cache")
+cache_size.set_function(lambda: len(_cache))
+
+class _CachedSecret:
+    def __init__(self, value: dict, ttl: float):
+        self.value = value
+        self.ttl = ttl
+        self.fetched_at = time.monotonic()
+        self.expires_at = self.fetched_at + ttl
+        self.refreshing = False
+
+def get_client():
+    """프로세스 전체에서 공유하는 Secrets Manager 클라이언트를 반환합니다."""
+    global _client
+
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            session = boto3.session.Session()
+
+            if aws_access_key_id and aws_secret_access_key:
+                _client = session.client(
+                    service_name='secretsmanager',
+                    region_name=region_name,
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key
+                )
+            else:
+                _client = session.client(
+                    service_name='secretsmanager',
+                    region_name=region_name,
+                )
+
+    return _client
 
+def _fetch_secret(secret_name: str) -> dict:
     try:
-        get_secret_value_response = client.get_secret_value(
+        get_secret_value_response = get_client().get_secret_value(
             SecretId=secret_name
         )
     except ClientError as e:
@@ -43,4 +86,112 @@ def get_secret(secret_name:str):
 
     secret = get_secret_value_response['SecretString']
 
-    return json.loads(secret)
\ No newline at end of file
+    return json.loads(secret)
+
+def _get_fetch_lock(secret_name: str) -> threading.Lock:
+    with _cache_lock:
+        lock = _fetch_locks.get(secret_name)
+
+        if lock is None:
+            lock = threading.Lock()
+            _fetch_locks[secret_name] = lock
+
+        return lock
+
+def _refresh_in_background(secret_name: str, entry: _CachedSecret):
+    try:
+        value = _fetch_secret(secret_name)
+    except Exception:
+        logger.warning(f"Background refresh failed for secret: {secret_name}", exc_info=True)
+
+        refreshes.inc(result="error")
+
+        with _cache_lock:
+            entry.refreshing = False
+        return
+
+    refreshes.inc(result="success")
+
+    with _cache_lock:
+        _cache[secret_name] = _CachedSecret(value, entry.ttl)
+
+def get_secret(secret_name:str, ttl: float = None):
+    """
+    시크릿을 조회합니다.
+
+    TTL 동안은 메모리에 캐시된 값을 반환하고, 만료가 가까워지면 백그라운드 스레드에서 미리 갱신합니다.
+    만료된 뒤 갱신에 실패하면 마지막으로 성공한 값을 그대로 반환하고, SECRET_CACHE_STALE_BACKOFF 동안 재조회를 미룹니다.
+    """
+    ttl = SECRET_CACHE_TTL if ttl is None else ttl
+    now = time.monotonic()
+
+    with _cache_lock:
+        entry = _cache.get(secret_name)
+
+        if entry is not None and now < entry.expires_at:
+            lookups.inc(result="hit")
+
+            refresh_ahead = min(SECRET_CACHE_REFRESH_AHEAD, entry.ttl / 2)
+
+            if now >= entry.expires_at - refresh_ahead and not entry.refreshing:
+                entry.refreshing = True
+                threading.Thread(target=_refresh_in_background, args=(secret_name, entry), daemon=True).start()
+
+            return dict(entry.value)
+
+    # 캐시에 없거나 만료된 경우 같은 시크릿을 동시에 여러 번 조회하지 않도록 잠금
+    with _get_fetch_lock(secret_name):
+        with _cache_lock:
+            entry = _cache.get(secret_name)
+
+            if entry is not None and time.monotonic() < entry.expires_at:
+                lookups.inc(result="hit")
+                return dict(entry.value)
+
+        lookups.inc(result="miss")
+
+        try:
+            value = _fetch_secret(secret_name)
+        except Exception:
+            if entry is None:
+                raise
+
+            logger.warning(f"Failed to refresh secret, serving stale value: {secret_name}", exc_info=True)
+
+            # AWS 장애 동안 호출마다 잠금을 잡고 다시 조회하지 않도록 만료 시각을 조금 미룹니다.
+            # (그동안은 백그라운드 갱신도 띄우지 않고 만료 후 여기서 다시 시도합니다)
+            with _cache_lock:
+                lookups.inc(result="stale")
+                entry.expires_at = time.monotonic() + SECRET_CACHE_STALE_BACKOFF
+                entry.refreshing = True
+                _cache[secret_name] = entry
+
+            return dict(entry.value)
+
+        with _cache_lock:
+            _cache[secret_name] = _CachedSecret(value, ttl)
+
+        return dict(value)
+
+async def get_secret_async(secret_name: str, ttl: float = None):
+    """
+    이벤트 루프에서 쓰는 get_secret.
+
+    캐시가 유효하면 바로 돌려주고, 없거나 만료돼 Secrets Manager 를 불러야 하면 스레드에서 조회합니다.
+    """
+    with _cache_lock:
+        entry = _cache.get(secret_name)
+        cached = entry is not None and time.monotonic() < entry.expires_at
+
+    if cached:
+        return get_secret(secret_name, ttl)
+
+    return await asyncio.to_thread(get_secret, secret_name, ttl)
+
+def invalidate_secret(secret_name: str = None):
+    """캐시된 시크릿을 비웁니다. 이름을 주지 않으면 전체를 비웁니다."""
+    with _cache_lock:
+        if secret_name is None:
+            _cache.clear()
+        else:
+            _cache.pop(secret_name, None)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Response, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Request, Response, Header, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
@@ -8,28 +8,23 @@ import logging
 
 from sqlalchemy import select, func, delete, case, cast, update
 from sqlalchemy.orm import Session
-from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 
 from typing import Optional, List
 
 from pydantic import BaseModel
 
-from src.utils import generate_random_string, str_to_bool
-from geoalchemy2.shape import to_shape
+from src.utils import generate_random_string, str_to_bool, token_cache, share_tile_cache, autocomplete, http_client, geocode_cache, share_admins, starred, share_serializer, share_bulk, password_hasher, firebase, recent_search
 
-import requests, json
-
-from korean_name_generator import namer
+import json
+import httpx
+import asyncio
 
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from passlib.hash import sha256_crypt
-from src.aws.secretManager import get_secret
-
-import firebase_admin
-from firebase_admin import auth
-from firebase_admin import credentials
+from src.aws.secretManager import get_secret, get_secret_async
 
 import os
 
@@ -37,8 +32,6 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-connection_info = get_secret('candleHelper/DB/postgres/prod')
-
 class EditWithTokenUserInfo(BaseModel):
     nickname: Optional[str] = None
     password: Optional[str] = None
@@ -75,6 +68,18 @@ class ShareChangeInfo(BaseModel):
     contacts: Optional[str] = None
     admins: Optional[str] = None
 
+class ShareEditInfo(BaseModel):
+    name: Optional[str] = None
+    goods: Optional[str] = None
+    jibun_address: Optional[str] = None
+    doro_address: Optional[str] = None
+    point_lat: Optional[float] = None
+    point_lng: Optional[float] = None
+    point_name: Optional[str] = None
+    contacts: Optional[str] = None
+    admins: Optional[str] = None
+    status: Optional[int] = None
+
 class LikeSearchInfo(BaseModel):
     map_only: Optional[str] = None
     southwest_lng: Optional[float] = None
@@ -84,6 +89,7 @@ class LikeSearchInfo(BaseModel):
 
 class User(BaseModel):
     id: int
+    tag: Optional[int] = None
 
 class RecentKeyword(BaseModel):
     keyword: str
@@ -101,7 +107,14 @@ class UpdateComplexedShareInfo(BaseModel):
 class UpdateComplexedShareInfoRequest(BaseModel):
     data: List[UpdateComplexedShareInfo]
 
-def verify_token(auth_token: str = Header(None), db: Session = Depends(database.get_db)):
+def verify_token(request: Request, auth_token: str = Header(None), db: Session = Depends(database.get_db)):
+    return check_token(request, auth_token, db)
+
+def verify_token_fresh(request: Request, auth_token: str = Header(None), db: Session = Depends(database.get_db)):
+    # 비밀번호 변경 / 회원 탈퇴 / 어드민 변경은 다른 워커에서 로그아웃된 토큰을 받지 않도록 캐시를 쓰지 않습니다.
+    return check_token(request, auth_token, db, fresh=True)
+
+def check_token(request: Request, auth_token: str, db: Session, fresh: bool = False):
     if auth_token is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -109,28 +122,16 @@ def verify_token(auth_token: str = Header(None), db: Session = Depends(database.
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    stmt = select(database.LoginToken).where(database.LoginToken.token == auth_token)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    token_info = token_cache.resolve_token(auth_token, db, request, fresh=fresh)
     
-    if row is None:
+    if token_info is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return User(id = row.user_id)
-
-def get_token_using_id(id: int, db: Session):
-    stmt = select(database.Users).where(database.Users.id == id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
-
-    if row is None:
-        return None
-    else:
-        return row.tag
+    return User(id = token_info.user_id, tag = token_info.tag)
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -140,15 +141,9 @@ router = APIRouter(dependencies=[Depends(verify_token)])
 
 seoul_time = datetime.now(ZoneInfo('Asia/Seoul'))
 
-certificate_json = None
-try:
-    certificate_json = json.loads(os.getenv("NANUMSA_SERVER_FIREBASE_ADMIN_CREDENTIAL_FILE_PATH"))
-except:
-    with open(os.getenv("NANUMSA_SERVER_FIREBASE_ADMIN_CREDENTIAL_FILE_PATH")) as f:
-        certificate_json = json.load(f)
-
-cred = credentials.Certificate(certificate_json)
-firebase_admin.initialize_app(cred)
+JUSO_ADDRESS_URL = "https://business.juso.go.kr/addrlink/addrLinkApi.do"
+KAKAO_ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+GEOCODE_TIMEOUT = float(os.getenv('GEOCODE_TIMEOUT') or 2)
 
 @router.patch('/user/nickname', tags=['app'])
 def change_nickname_with_user_token(userInfo: EditWithTokenUserInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
@@ -158,9 +153,11 @@ def change_nickname_with_user_token(userInfo: EditWithTokenUserInfo, user: User
     return JSONResponse(content=jsonable_encoder({"success": { "nickname": userInfo.nickname }}))
 
 @router.patch('/user/password', tags=['app'])
-def change_password_with_user_token(userInfo: EditWithTokenUserInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    db.query(database.Users).filter(database.Users.id == user.id).update({'password': sha256_crypt.using(salt='fix').hash(userInfo.password)})
-    db.commit()
+async def change_password_with_user_token(userInfo: EditWithTokenUserInfo, user: User = Depends(verify_token_fresh), db: AsyncSession = Depends(database.get_async_db)):
+    password = await password_hasher.hash_password(userInfo.password)
+
+    await db.execute(update(database.Users).where(database.Users.id == user.id).values(password=password))
+    await db.commit()
 
     return JSONResponse(content=jsonable_encoder({"success": "비밀번호가 성공적으로 변경되었습니다." }))
 
@@ -172,9 +169,11 @@ def change_contacts_with_user_token(userInfo: EditWithTokenUserInfo, user: User
     return JSONResponse(content=jsonable_encoder({"success": "연락처가 성공적으로 변경되었습니다." }))
 
 @router.post('/user/password', tags=['app'])
-def change_password_with_user_token(userInfo: EditWithTokenUserInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt_user = select(database.Users).where(database.Users.id == user.id, database.Users.password == sha256_crypt.using(salt='fix').hash(userInfo.password))
-    matched_row_user = db.execute(stmt_user)
+async def change_password_with_user_token(userInfo: EditWithTokenUserInfo, user: User = Depends(verify_token_fresh), db: AsyncSession = Depends(database.get_async_db)):
+    password = await password_hasher.hash_password(userInfo.password)
+
+    stmt_user = select(database.Users).where(database.Users.id == user.id, database.Users.password == password)
+    matched_row_user = await db.execute(stmt_user)
     row_user = matched_row_user.scalars().first()
 
     if row_user is None:
@@ -208,26 +207,49 @@ def pass_tag_with_user_tag(tags: str, db: Session = Depends(database.get_db)):
     else:
         return JSONResponse(content=jsonable_encoder({"success": response_data}))
 
+async def geocode_address(client: httpx.AsyncClient, headers: dict, address: str):
+    """카카오 주소 검색으로 (lat, lng) 를 구합니다. 실패하면 None."""
+    try:
+        kakao_response = await client.get(KAKAO_ADDRESS_URL, headers=headers, params={"query": address}, timeout=GEOCODE_TIMEOUT)
+        kakao_response.raise_for_status()
+
+        kakao_response_address_info = kakao_response.json()['documents'][0]['address']
+
+        return float(kakao_response_address_info['y']), float(kakao_response_address_info['x'])
+    except (httpx.HTTPError, ValueError, KeyError, IndexError, TypeError) as e:
+        logger.warning(f"Failed to geocode address {address}: {e!r}")
+        return None
+
 @router.get("/address", tags=['app'])
-def read_address_with_keyword(keyword: str):
-    url = "https://business.juso.go.kr/addrlink/addrLinkApi.do"
-    token = get_secret('candleHelper/authToken/searchAddress')
+async def read_address_with_keyword(keyword: str, db: AsyncSession = Depends(database.get_async_db)):
+    client = http_client.get_client()
+
+    token = await get_secret_async('candleHelper/authToken/searchAddress')
     data = {"confmKey": token['token'], "currentPage": 1, "countPerPage": 10, "keyword": keyword, "resultType": "json"}
-    response = requests.get(url, data=data)
+    response = await client.get(JUSO_ADDRESS_URL, params=data)
+
+    jusos = response.json()['results']['juso'] or []
 
-    kakao_url = "https://dapi.kakao.com/v2/local/search/address.${FORMAT}"
-    kakao_token = get_secret('candleHelper/authToken/searchAddressToPoint')
-    kakao_headers = {"Authorization": "KakaoAK %s"  % (kakao_token['token'])}
+    async def fetch_points(addresses: list) -> list:
+        kakao_token = await get_secret_async('candleHelper/authToken/searchAddressToPoint')
+        kakao_headers = {"Authorization": "KakaoAK %s"  % (kakao_token['token'])}
+
+        # 주소별 좌표 검색을 동시에 보냅니다.
+        return await asyncio.gather(*[geocode_address(client, kakao_headers, address) for address in addresses])
+
+    # 캐시에 없는 주소만 카카오로 조회합니다.
+    points = await geocode_cache.geocode_many(db, [juso['jibunAddr'] for juso in jusos], fetch_points)
 
     returnResponse = []
 
-    for juso in response.json()['results']['juso']:
-        kakao_params = {"query": juso['jibunAddr']}
-        kakao_response = requests.get(kakao_url, headers=kakao_headers, params=kakao_params)
+    for juso in jusos:
+        point = points.get(juso['jibunAddr'])
 
-        kakao_response_address_info = kakao_response.json()['documents'][0]['address']
+        # 좌표를 못 구한 주소는 제외합니다.
+        if point is None:
+            continue
 
-        returnResponse.append({'doroAddress': juso['roadAddrPart1'], 'jibunAddress': juso['jibunAddr'], 'lat': float(kakao_response_address_info['y']), 'lng': float(kakao_response_address_info['x'])})
+        returnResponse.append({'doroAddress': juso['roadAddrPart1'], 'jibunAddress': juso['jibunAddr'], 'lat': point[0], 'lng': point[1]})
 
     returnResponse = json.dumps(returnResponse)
     return Response(returnResponse, media_type="application/json")
@@ -235,10 +257,11 @@ def read_address_with_keyword(keyword: str):
 @router.post("/share/add", tags=['app'])
 def add_share_info(shareInfo: ShareInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
     registed_id = user.id
+    admin_tags = share_admins.parse_admins(shareInfo.admins)
 
     share_info = database.ShareInfo(
         name=shareInfo.name,
-        admins=shareInfo.admins, 
+        admins=share_admins.format_admins(admin_tags), 
         contacts=shareInfo.contacts,
         jibun_address=shareInfo.jibun_address,
         doro_address=shareInfo.doro_address,
@@ -250,22 +273,23 @@ def add_share_info(shareInfo: ShareInfo, user: User = Depends(verify_token), db:
         edited_at=seoul_time
     )
     db.add(share_info)    
+    db.flush()
+    share_admins.set_admins(db, share_info.id, admin_tags, update_share=False)
     db.commit()
+    share_tile_cache.invalidate_point(shareInfo.point_lat, shareInfo.point_lng)
+    autocomplete.index.upsert(share_info.id, shareInfo.name, shareInfo.doro_address, shareInfo.jibun_address, shareInfo.point_lat, shareInfo.point_lng)
 
     return JSONResponse(content=jsonable_encoder({"success": share_info.id}))
 
 @router.patch("/share/status/{id}", tags=['app'])
 def chage_share_status(shareInfo: ShareChangeStatusInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'status': shareInfo.status})
         db.commit()
 
@@ -275,16 +299,13 @@ def chage_share_status(shareInfo: ShareChangeStatusInfo, user: User = Depends(ve
     
 @router.patch('/share/goods/quantity/{id}', tags=['app'])
 def change_share_goods_quantity(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'goods': shareInfo.goods})
         db.commit()
 
@@ -294,18 +315,16 @@ def change_share_goods_quantity(shareInfo: ShareChangeInfo, db: Session = Depend
 
 @router.patch('/share/name/{id}', tags=['app'])
 def change_share_name(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'name': shareInfo.name})
         db.commit()
+        autocomplete.index.update(shareInfo.id, name=shareInfo.name)
 
         return JSONResponse(content=jsonable_encoder({"success": shareInfo.name}))
     else:
@@ -313,54 +332,47 @@ def change_share_name(shareInfo: ShareChangeInfo, db: Session = Depends(database
 
 @router.patch('/share/point/{id}', tags=['app'])
 def change_share_point_info(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
+        share_tile_cache.invalidate_point(shareInfo.point_lat, shareInfo.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'jibun_address': shareInfo.jibun_address, 'doro_address': shareInfo.doro_address, 'point_lat': shareInfo.point_lat, 'point_lng': shareInfo.point_lng, 'point_name': shareInfo.point_name})
         db.commit()
+        autocomplete.index.update(shareInfo.id, jibun_address=shareInfo.jibun_address, doro_address=shareInfo.doro_address, point_lat=shareInfo.point_lat, point_lng=shareInfo.point_lng)
 
         return JSONResponse(content=jsonable_encoder({"success": {'jibun_address': shareInfo.jibun_address, 'doro_address': shareInfo.doro_address, 'point_lat': shareInfo.point_lat, 'point_lng': shareInfo.point_lng, 'point_name': shareInfo.point_name}}))
     else:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터의 관리자가 아닙니다."}))
     
-@router.patch('/share/admins/{id}', tags=['app'])
+@router.patch('/share/admins/{id}', tags=['app'], dependencies=[Depends(verify_token_fresh)])
 def change_share_admins_info(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
-        db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'admins': shareInfo.admins})
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
+        admins = share_admins.set_admins(db, shareInfo.id, share_admins.parse_admins(shareInfo.admins))
         db.commit()
 
-        return JSONResponse(content=jsonable_encoder({"success": shareInfo.admins}))
+        return JSONResponse(content=jsonable_encoder({"success": admins}))
     else:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터의 관리자가 아닙니다."}))
 
 @router.patch('/share/goods/{id}', tags=['app'])
 def change_share_goods(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'goods': shareInfo.goods})
         db.commit()
 
@@ -370,57 +382,37 @@ def change_share_goods(shareInfo: ShareChangeInfo, db: Session = Depends(databas
 
 @router.post('/search/recent', tags=['app'])
 def add_recent_search_keyword(keywordInfo: RecentKeyword, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    # 기존에 겹치는 키워드 지우기
-    stmt = delete(database.RecentSearchKeywords).where(
-        database.RecentSearchKeywords.user_id == user.id,
-        database.RecentSearchKeywords.keyword == keywordInfo.keyword
-    )
-    db.execute(stmt)
-    db.commit()
-
-    # 키워드 넣기
-    recent_keyword_data = database.RecentSearchKeywords(user_id=user.id, keyword=keywordInfo.keyword, type=keywordInfo.type)
-    db.add(recent_keyword_data)
-    db.commit()
+    # 버퍼에 넣고 주기적으로 한 번에 반영합니다. (src/utils/recent_search.py)
+    recent_search.buffer.add(user.id, keywordInfo.keyword, keywordInfo.type)
 
     return get_recent_search_keyword(user, db)
 
 @router.delete('/search/recent/{id}', tags=['app'])
 def delete_recent_search_keyword(id: int, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt = delete(database.RecentSearchKeywords).where(
-        database.RecentSearchKeywords.user_id == user.id,
-        database.RecentSearchKeywords.id == id
-    )
-    db.execute(stmt)
-    db.commit()
+    recent_search.buffer.discard(db, user.id, id)
 
     return JSONResponse(content=jsonable_encoder({"success": id}))
 
 @router.delete('/search/recent_all', tags=['app'])
 def delete_recent_search_keyword(user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt = delete(database.RecentSearchKeywords).where(
-        database.RecentSearchKeywords.user_id == user.id,
-    )
-    db.execute(stmt)
-    db.commit()
+    recent_search.buffer.discard(db, user.id)
 
     return JSONResponse(content=jsonable_encoder({"success": "삭제가 완료되었습니다."}))
 
 @router.get('/search/recent', tags=['app'])
 def get_recent_search_keyword(user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt = select(database.RecentSearchKeywords).where(database.RecentSearchKeywords.user_id == user.id).order_by(database.RecentSearchKeywords.created_at.desc())
-    matched = db.execute(stmt)
-    rows = matched.mappings().all()
-
-    response_data = [recent_keyword["RecentSearchKeywords"] for recent_keyword in rows]
+    response_data = recent_search.get_recent(db, user.id)
 
     return JSONResponse(content=jsonable_encoder({"success": response_data}))
 
 @router.post('/share/star', tags=['app'])
 def add_share_star(info: ShareStarInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
     if info.to_be:
-        star_data = database.StarredShare(user_id=user.id, share_id=info.id)
-        db.add(star_data)
+        # 이미 즐겨찾기한 나눔이면 무시합니다. ((user_id, share_id) 유니크 인덱스)
+        stmt = insert(database.StarredShare).values(user_id=user.id, share_id=info.id).on_conflict_do_nothing(
+            index_elements=[database.StarredShare.user_id, database.StarredShare.share_id]
+        )
+        db.execute(stmt)
         db.commit()
     else:
         stmt = delete(database.StarredShare).where(
@@ -433,33 +425,24 @@ def add_share_star(info: ShareStarInfo, user: User = Depends(verify_token), db:
     return JSONResponse(content=jsonable_encoder({"success": {'status': info.to_be, 'id': info.id}}))
 
 @router.post('/share/admin', tags=['app'])
-def change_share_admin_info(info: ShareStarInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    stmt = select(database.Users).where(database.Users.id == user.id)
-    matched = db.execute(stmt)
-    user_row = matched.scalars().first()
-
-    share_stmt = select(database.ShareInfo).where(database.ShareInfo.id == info.id)
-    share_matched = db.execute(share_stmt)
-    share_row = share_matched.scalars().first()
+def change_share_admin_info(info: ShareStarInfo, user: User = Depends(verify_token_fresh), db: Session = Depends(database.get_db)):
+    share_row, is_admin = share_admins.get_share_with_permission(db, info.id, user.tag)
     
     if share_row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
     
-    admins = list(map(int, share_row.admins.split(",")))
-    
-    if user_row.tag in admins:
-        new_admin_data = None
+    if is_admin:
+        admins = share_admins.parse_admins(share_row.admins)
 
         if info.to_be is False and len(admins) == 1:
             return JSONResponse(content=jsonable_encoder({"error": "최소 한명의 관리자는 필요합니다."}))
         elif info.to_be is False:
-            another_admins = [x - user_row.tag for x in admins]
-            new_admin_data = ','.join(map(str, another_admins))
-        elif info.to_be is True:
-            admins.append(user_row.tag)
-            new_admin_data = ','.join(map(str, admins))
+            admins = [x for x in admins if x != user.tag]
+        elif user.tag not in admins:
+            admins.append(user.tag)
 
-        db.query(database.ShareInfo).filter(database.ShareInfo.id == info.id).update({'admins': new_admin_data})
+        share_tile_cache.invalidate_point(share_row.point_lat, share_row.point_lng, db)
+        new_admin_data = share_admins.set_admins(db, info.id, admins)
         db.commit()
 
         return JSONResponse(content=jsonable_encoder({"success": {"id": info.id, "admins": new_admin_data}}))
@@ -468,31 +451,16 @@ def change_share_admin_info(info: ShareStarInfo, user: User = Depends(verify_tok
 
 @router.get('/share/list/my', tags=['app'])
 def get_my_share_list(user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    tag = get_token_using_id(user.id, db)
-    tag = str(tag)
+    tag = user.tag
 
     stmt = (
         select(
-            database.ShareInfo.id, 
-            database.ShareInfo.name, 
-            database.ShareInfo.admins,
-            database.ShareInfo.contacts,
-            database.ShareInfo.jibun_address,
-            database.ShareInfo.doro_address,
-            database.ShareInfo.point_lat,
-            database.ShareInfo.point_lng,
-            database.ShareInfo.point_name,
-            database.ShareInfo.goods,
-            database.ShareInfo.point,
-            database.ShareInfo.status,
-            case(
-                (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                else_=False
-            ).label('starred')
+            *share_serializer.share_columns(),
+            starred.is_starred(user.id).label('starred')
         )
-        .outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id)
+        .join(database.ShareAdmins, database.ShareAdmins.share_id == database.ShareInfo.id)
         .where(
-            database.ShareInfo.admins.like(f"%{tag}%"),
+            database.ShareAdmins.user_tag == tag,
             database.ShareInfo.is_deleted == False
         )
     )
@@ -504,56 +472,16 @@ def get_my_share_list(user: User = Depends(verify_token), db: Session = Depends(
     if not results:
             return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
 
-    response_data = []
-    for result in results:
-        row_dict = {
-            "id": result.id,
-            "name": result.name,
-            "admins": result.admins,
-            "contacts": result.contacts,
-            "jibun_address": result.jibun_address,
-            "doro_address": result.doro_address,
-            "point_lat": result.point_lat,
-            "point_lng": result.point_lng,
-            "point_name": result.point_name,
-            "goods": result.goods,
-            "status": result.status,
-            "starred": result.starred,
-            "point": to_shape(result.point).__geo_interface__ if result.point else None
-        }
-        response_data.append(row_dict)
-
-    return JSONResponse(content=jsonable_encoder({"success": response_data}))
+    return share_serializer.success([share_serializer.share_to_dict(result) for result in results])
 
 @router.get('/share/list/starred', tags=['app'])
 def get_starred_share_list(user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    tag = get_token_using_id(user.id, db)
-    tag = str(tag)
-
     stmt = (
         select(
-            database.ShareInfo.id, 
-            database.ShareInfo.name, 
-            database.ShareInfo.admins,
-            database.ShareInfo.contacts,
-            database.ShareInfo.jibun_address,
-            database.ShareInfo.doro_address,
-            database.ShareInfo.point_lat,
-            database.ShareInfo.point_lng,
-            database.ShareInfo.point_name,
-            database.ShareInfo.goods,
-            database.ShareInfo.point,
-            database.ShareInfo.status,
-            case(
-                (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                else_=False
-            ).label('starred')
-        )
-        .outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id)
-        .where(
-            database.StarredShare.share_id != None,
-            database.StarredShare.user_id == user.id
+            *share_serializer.share_columns(),
+            starred.is_starred(user.id).label('starred')
         )
+        .where(starred.is_starred(user.id))
     )
     
 
@@ -563,26 +491,7 @@ def get_starred_share_list(user: User = Depends(verify_token), db: Session = Dep
     if not results:
             return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
 
-    response_data = []
-    for result in results:
-        row_dict = {
-            "id": result.id,
-            "name": result.name,
-            "admins": result.admins,
-            "contacts": result.contacts,
-            "jibun_address": result.jibun_address,
-            "doro_address": result.doro_address,
-            "point_lat": result.point_lat,
-            "point_lng": result.point_lng,
-            "point_name": result.point_name,
-            "goods": result.goods,
-            "status": result.status,
-            "starred": result.starred,
-            "point": to_shape(result.point).__geo_interface__ if result.point else None
-        }
-        response_data.append(row_dict)
-
-    return JSONResponse(content=jsonable_encoder({"success": response_data}))
+    return share_serializer.success([share_serializer.share_to_dict(result) for result in results])
 
 @router.get('/admin/info/tag', tags=['app'])
 def get_starred_share_list(tags = str, db: Session = Depends(database.get_db)):
@@ -609,22 +518,74 @@ def get_starred_share_list(tags = str, db: Session = Depends(database.get_db)):
     
     return JSONResponse(content=jsonable_encoder({"success": response_data}))
 
+@router.patch('/share/{id}', tags=['app'])
+def edit_share_item(id: int, shareInfo: ShareEditInfo, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
+    # 보낸 필드만 수정합니다.
+    fields = shareInfo.model_dump(exclude_unset=True)
+    admin_tags = None
+
+    if not fields:
+        return JSONResponse(content=jsonable_encoder({"error": "수정할 값이 없습니다."}))
+
+    if "admins" in fields:
+        admin_tags = share_admins.parse_admins(fields["admins"])
+
+        if not admin_tags:
+            return JSONResponse(content=jsonable_encoder({"error": "최소 한명의 관리자는 필요합니다."}))
+
+        fields["admins"] = share_admins.format_admins(admin_tags)
+
+    # 관리자 확인과 수정을 UPDATE ... RETURNING 한 번으로 처리합니다. (old 는 수정 전 row)
+    old = database.ShareInfo.__table__.alias('old')
+    stmt = (
+        update(database.ShareInfo.__table__)
+        .where(
+            database.ShareInfo.id == id,
+            old.c.id == database.ShareInfo.id,
+            database.ShareInfo.is_deleted == False,
+            share_admins.admin_exists(database.ShareInfo.id, user.tag)
+        )
+        .values(**fields)
+        .returning(*share_serializer.share_columns(), old.c.point_lat.label('old_point_lat'), old.c.point_lng.label('old_point_lng'))
+    )
+    result = db.execute(stmt).mappings().first()
+
+    if result is None:
+        db.rollback()
+        row, is_admin = share_admins.get_share_with_permission(db, id, user.tag)
+
+        if row is None or row.is_deleted:
+            return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
+
+        return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터의 관리자가 아닙니다."}))
+
+    if admin_tags is not None:
+        share_admins.set_admins(db, id, admin_tags, update_share=False)
+
+    share_tile_cache.invalidate_point(result.old_point_lat, result.old_point_lng, db)
+    share_tile_cache.invalidate_point(result.point_lat, result.point_lng, db)
+    db.commit()
+
+    autocomplete.index.update(id, **{
+        key: fields[key] for key in ('name', 'doro_address', 'jibun_address', 'point_lat', 'point_lng') if key in fields
+    })
+
+    return share_serializer.success(share_serializer.share_to_dict(result))
+
 @router.delete('/share/{id}', tags=['app'])
 def delete_share_item(id: int, user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
-    tag = get_token_using_id(user.id, db)
+    tag = user.tag
 
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, id, tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == id).update({'is_deleted': True})
         db.commit()
+        autocomplete.index.remove(id)
 
         return JSONResponse(content=jsonable_encoder({"success": True}))
     else:
@@ -636,64 +597,65 @@ def delete_share_items(ids: str, db: Session = Depends(database.get_db)):
 
     logger.info(f"Received request for item_id: {ids}")
 
-    stmt = update(database.ShareInfo).where(database.ShareInfo.id.in_(ids)).values(is_deleted=True)
-    db.execute(stmt)
-    db.commit()
+    outcomes = share_bulk.apply_share_changes(db, deletes=ids)
 
-    return JSONResponse(content=jsonable_encoder({"success": ids}))
+    return JSONResponse(content=jsonable_encoder({
+        "success": ids,
+        "results": [{"id": id, "result": outcomes[id]} for id in ids]
+    }))
 
-@router.post('/share/complexed', tags=['app'])
+@router.post('/share/complexed', tags=['app'], dependencies=[Depends(verify_token_fresh)])
 def update_share_item_complexed(data: UpdateComplexedShareInfoRequest, db: Session = Depends(database.get_db)):
     body = data.data
-    result = []
-
-    for info in body:
-        result.append(info.id)
-
-        if info.type == "DELETE":
-            stmt = update(database.ShareInfo).where(database.ShareInfo.id == info.id).values(is_deleted=True)
-            db.execute(stmt)
-            db.commit()
-        else:
-            stmt = update(database.ShareInfo).where(database.ShareInfo.id == info.id).values(admins=info.admins)
-            db.execute(stmt)
-            db.commit()
-    
-    return JSONResponse(content=jsonable_encoder({"success": result}))
+    result = [info.id for info in body]
+
+    # 같은 나눔이 여러 번 들어오면 마지막 항목만 반영합니다.
+    last_index = {info.id: index for index, info in enumerate(body)}
+
+    deletes = [info.id for index, info in enumerate(body) if last_index[info.id] == index and info.type == "DELETE"]
+    admin_updates = {info.id: info.admins for index, info in enumerate(body) if last_index[info.id] == index and info.type != "DELETE"}
+
+    outcomes = share_bulk.apply_share_changes(db, deletes=deletes, admin_updates=admin_updates)
+
+    return JSONResponse(content=jsonable_encoder({
+        "success": result,
+        "results": [
+            {"id": info.id, "type": info.type, "result": outcomes[info.id] if last_index[info.id] == index else share_bulk.DUPLICATED}
+            for index, info in enumerate(body)
+        ]
+    }))
 
 @router.delete('/user', tags=['app'])
-def delete_user(user: User = Depends(verify_token), db: Session = Depends(database.get_db)):
+def delete_user(user: User = Depends(verify_token_fresh), db: Session = Depends(database.get_db)):
     # 나눔에 관여된 어드민 전부 삭제
     stmt = select(database.Users).where(database.Users.id == user.id)
     matched = db.execute(stmt)
     user_row = matched.scalars().first()
 
-    user_tag = user_row
+    user_tag = user_row.tag
 
-    share_stmt = select(database.ShareInfo).where(database.ShareInfo.admins.like(f"%{user_tag}%"),)
+    share_stmt = select(database.ShareInfo).where(database.ShareInfo.id.in_(share_admins.managed_share_ids(user_tag)))
     share_matched = db.execute(share_stmt)
-    share_row = share_matched.mappings().all()
-
-    share_infos = [row["ShareInfo"] for row in share_row]
+    share_infos = share_matched.scalars().all()
 
     for info in share_infos:
-        admins = [int(num) for num in info["admins"](',')]
-        admins.remove(user_tag)
+        admins = [tag for tag in share_admins.parse_admins(info.admins) if tag != user_tag]
 
-        stmt = update(database.ShareInfo).where(database.ShareInfo.id == info["id"]).values(admins=",".join(admins))
-        db.execute(stmt)
-        db.commit()
+        share_tile_cache.invalidate_point(info.point_lat, info.point_lng, db)
+        share_admins.set_admins(db, info.id, admins)
+
+    db.commit()
 
 
     # 소셜 회원인 경우 firebase/naver/kakao 컬럼 삭제
     if user_row.social_type == 1 or user_row.social_type == 3:
-        auth.delete_user(user_row.social_uid)
+        firebase.get_auth().delete_user(user_row.social_uid)
     elif user_row.social_type == 5:
         token = get_secret('candleHelper/Auth/LoginWithNaver')
-        requests.get(f"https://nid.naver.com/oauth2.0/token?grant_type=delete&client_id={token['id']}&client_secret={token['secret']}&access_token={user_row.naver_client_id}")
+        httpx.get(f"https://nid.naver.com/oauth2.0/token?grant_type=delete&client_id={token['id']}&client_secret={token['secret']}&access_token={user_row.naver_client_id}")
     elif user_row.social_type == 4:
         token = get_secret("nanumsa/key/kakao/admin")
-        requests.post(f"https://kapi.kakao.com/v1/user/unlink", headers={'Authorization': f"KakaoAK {token["token"]}", "Content-Type": "application/x-www-form-urlencoded;charset=utf-8"}, data={"target_id_type": "user_id", "target_id": f"{str(user_row.kakao_user_id)}"})
+        httpx.post(f"https://kapi.kakao.com/v1/user/unlink", headers={'Authorization': f"KakaoAK {token["token"]}", "Content-Type": "application/x-www-form-urlencoded;charset=utf-8"}, data={"target_id_type": "user_id", "target_id": f"{str(user_row.kakao_user_id)}"})
 
     # 유저 컬럼에서 is_deleted = true로 변경
     stmt = update(database.Users).where(database.Users.id == user.id).values(is_deleted=True, edited_at=seoul_time)
@@ -704,5 +666,6 @@ def delete_user(user: User = Depends(verify_token), db: Session = Depends(databa
     logout_target = db.query(database.LoginToken).filter(database.LoginToken.user_id == user.id).first()
     db.delete(logout_target)
     db.commit()
+    token_cache.invalidate_user(user.id)
 
     return JSONResponse(content=jsonable_encoder({"success": "회원 탈퇴가 완료되었습니다."}))
\ No newline at end of file
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.encoders import jsonable_encoder
+
+import hmac
+import ipaddress
+import os
+
+from src.database import database
+from src.database.pool_metrics import pool_status
+from src.utils import metrics, geocode_cache, password_hasher, startup
+
+# 내부용 엔드포인트 (/internal/*, /metrics) 접근 제한
+# - INTERNAL_API_TOKEN 을 설정하면 "Authorization: Bearer <토큰>" 이 맞는 요청은 어디서든 받습니다. (Prometheus 는 authorization 설정)
+# - 토큰이 없으면 INTERNAL_ALLOWED_NETWORKS 안의 주소에서 직접 들어온 요청만 받습니다. (기본은 localhost)
+#   nginx 를 거친 요청(X-Forwarded-For / X-Real-IP)은 nginx 주소로 보이므로 주소만으로는 받지 않습니다.
+INTERNAL_API_TOKEN = os.getenv('INTERNAL_API_TOKEN')
+INTERNAL_ALLOWED_NETWORKS = [
+    ipaddress.ip_network(network.strip())
+    for network in (os.getenv('INTERNAL_ALLOWED_NETWORKS') or '127.0.0.1/32,::1/128').split(',')
+    if network.strip()
+]
+
+def _is_allowed_address(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+
+    return any(address in network for network in INTERNAL_ALLOWED_NETWORKS)
+
+def verify_internal_access(request: Request, authorization: str = Header(None)):
+    if INTERNAL_API_TOKEN and authorization is not None:
+        scheme, _, token = authorization.partition(" ")
+
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), INTERNAL_API_TOKEN.encode()):
+            return
+
+    proxied = "x-forwarded-for" in request.headers or "x-real-ip" in request.headers
+
+    if not proxied and request.client is not None and _is_allowed_address(request.client.host):
+        return
+
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+router = APIRouter(prefix='/internal', include_in_schema=False, dependencies=[Depends(verify_internal_access)])
+
+# Prometheus 수집용
+metrics_router = APIRouter(include_in_schema=False, dependencies=[Depends(verify_internal_access)])
+
+@metrics_router.get('/metrics', tags=['internal'])
+def get_prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get('/pool', tags=['internal'])
+def get_pool_metrics():
+    return JSONResponse(content=jsonable_encoder({"success": {
+        "settings": database.pool_settings,
+        "status": {
+            "sync": pool_status(database.engine.pool),
+            "async": pool_status(database.async_engine.sync_engine.pool),
+        },
+        "metrics": metrics.snapshot("db_pool_"),
+    }}))
+
+@router.get('/secrets', tags=['internal'])
+def get_secret_cache_metrics():
+    return JSONResponse(content=jsonable_encoder({"success": metrics.snapshot("secret_cache_")}))
+
+@router.get('/geocode', tags=['internal'])
+def get_geocode_cache_metrics():
+    return JSONResponse(content=jsonable_encoder({"success": geocode_cache.hit_ratio()}))
+
+@router.get('/password-hash', tags=['internal'])
+def get_password_hash_metrics():
+    return JSONResponse(content=jsonable_encoder({"success": {
+        "settings": {
+            "workers": password_hasher.PASSWORD_HASH_WORKERS,
+            "max_concurrency": password_hasher.PASSWORD_HASH_MAX_CONCURRENCY,
+        },
+        "metrics": metrics.snapshot("password_hash_"),
+    }}))
+
+@router.get('/startup', tags=['internal'])
+def get_startup_timings():
+    return JSONResponse(content=jsonable_encoder({"success": startup.timings}))
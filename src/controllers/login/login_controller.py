@@ -4,22 +4,19 @@ from fastapi.encoders import jsonable_encoder
 
 from src.database import database
 
-from sqlalchemy import select
+from sqlalchemy import select, update, delete
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from typing import Optional, List
 
 from pydantic import BaseModel
 
-from src.utils import generate_random_string
-
-from korean_name_generator import namer
+from src.utils import generate_random_string, token_cache, password_hasher
 
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from passlib.hash import sha256_crypt
-
 router = APIRouter()
 
 class LoginByTokenInfo(BaseModel):
@@ -79,22 +76,29 @@ def login_with_token(user: LoginByTokenInfo, db: Session = Depends(database.get_
 
 
 @router.post('/login/email', tags=['login'])
-def login_with_email(loginInfo: LoginInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.Users).where(database.Users.email == loginInfo.email, database.Users.password == sha256_crypt.using(salt='fix').hash(loginInfo.password))
-    matchedRow = db.execute(stmt)
+async def login_with_email(loginInfo: LoginInfo, db: AsyncSession = Depends(database.get_async_db)):
+    password = await password_hasher.hash_password(loginInfo.password)
+
+    return await login_with_password_hash(loginInfo.email, password, db)
+
+async def login_with_password_hash(email: str, password: str, db: AsyncSession):
+    stmt = select(database.Users).where(database.Users.email == email, database.Users.password == password)
+    matchedRow = await db.execute(stmt)
     row = matchedRow.scalars().first()
 
     if row and row.id:
-        token_before = db.query(database.LoginToken).filter(database.LoginToken.user_id == row.id).first()
+        matched_token = await db.execute(select(database.LoginToken).where(database.LoginToken.user_id == row.id))
+        token_before = matched_token.scalars().first()
 
         if token_before is not None:
-            db.delete(token_before)
-            db.commit()
+            await db.delete(token_before)
+            await db.commit()
+            token_cache.invalidate_token(token_before.token)
         token = generate_random_string.generate_secure_string(64)
 
         loginData = database.LoginToken(token=token, user_id=row.id, edited_at=seoul_time)
         db.add(loginData)    
-        db.commit()
+        await db.commit()
 
         return JSONResponse(content=jsonable_encoder({"success": { "token": token, "nickname": row.nickname, "tag": row.tag, "isSocial": False }}))
     else:
@@ -122,6 +126,7 @@ def login_with_social(loginInfo: LoginBySocialInfo, db: Session = Depends(databa
         if token_before is not None:
             db.delete(token_before)
             db.commit()
+            token_cache.invalidate_token(token_before.token)
         token = generate_random_string.generate_secure_string(64)
 
         loginData = database.LoginToken(token=token, user_id=row.id, edited_at=seoul_time)
@@ -157,6 +162,7 @@ def logout_with_token(info: LogoutUserInfo, db: Session = Depends(database.get_d
     if logout_target is not None:
         db.delete(logout_target)
         db.commit()
+        token_cache.invalidate_token(info.token)
 
         return JSONResponse(content=jsonable_encoder({"success": "로그아웃이 완료되었습니다."}))
     else:
@@ -177,6 +183,9 @@ def add_new_social_user(user: SocialUser, db: Session = Depends(database.get_db)
     row = matchedRow.scalars().first()
 
     if row is None:
+        # 소셜 첫 가입에서만 쓰므로 앱을 띄울 때가 아니라 필요할 때 불러옵니다. (firebase 와 같은 방식)
+        from korean_name_generator import namer
+
         nickname = namer.generate(True)
 
         userData = database.Users(email=user.email, nickname=nickname, contacts=None, name=None, password=None, edited_at='NOW()', social_type=user.social_type, social_uid=user.social_uid, naver_client_id=user.naver_client_id, kakao_user_id=user.kakao_user_id)
@@ -193,38 +202,36 @@ def add_new_social_user(user: SocialUser, db: Session = Depends(database.get_db)
     return login_with_social(SocialLoginUser, db)
 
 @router.post("/user/new", tags=['login'])
-def add_new_user(user: User, db: Session = Depends(database.get_db)):
+async def add_new_user(user: User, db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(database.Users).where(database.Users.email == user.email)
-    matchedRow = db.execute(stmt)
+    matchedRow = await db.execute(stmt)
     row = matchedRow.scalars().first()
 
     if row:
         return JSONResponse(content=jsonable_encoder({"error": "이미 존재하는 이메일입니다."}))
     else:
-        userData = database.Users(email=user.email, nickname=user.nickname, contacts=",".join(user.contacts), name=user.name, password=sha256_crypt.using(salt='fix').hash(user.password), edited_at='NOW()', social_type=0)
-        db.add(userData)    
-        db.commit()
+        password = await password_hasher.hash_password(user.password)
 
-        class LoginUser:
-            email = userData.email
-            password = user.password
+        userData = database.Users(email=user.email, nickname=user.nickname, contacts=",".join(user.contacts), name=user.name, password=password, edited_at='NOW()', social_type=0)
+        db.add(userData)    
+        await db.commit()
 
-        return login_with_email(LoginUser, db)
+        # 방금 만든 해시로 바로 로그인합니다. (해시를 다시 계산하지 않음)
+        return await login_with_password_hash(user.email, password, db)
 
 @router.patch("/user/password/token", tags=['login'])
-def add_new_user(info: ChangePasswordRequest, db: Session = Depends(database.get_db)):
+async def add_new_user(info: ChangePasswordRequest, db: AsyncSession = Depends(database.get_async_db)):
     stmt = select(database.ResetPassword).where(database.ResetPassword.token == info.token)
-    matchedRow = db.execute(stmt)
+    matchedRow = await db.execute(stmt)
     row = matchedRow.scalars().first()
 
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "존재하지 않거나 만료된 토큰입니다."}))
     else:
-        db.query(database.Users).filter(database.Users.id == row.user_id).update({'password': sha256_crypt.using(salt='fix').hash(info.password)})
-        db.commit()
+        password = await password_hasher.hash_password(info.password)
 
-        expired_token_row = db.query(database.ResetPassword).filter(database.ResetPassword.token == info.token).first()
-        db.delete(expired_token_row)
-        db.commit()
+        await db.execute(update(database.Users).where(database.Users.id == row.user_id).values(password=password))
+        await db.execute(delete(database.ResetPassword).where(database.ResetPassword.token == info.token))
+        await db.commit()
 
         return JSONResponse(content=jsonable_encoder({"success": "비밀번호 변경이 완료되었습니다."}))
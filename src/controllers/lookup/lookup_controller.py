@@ -1,32 +1,30 @@
-from fastapi import APIRouter, Depends, Response, Header, HTTPException, status
+from fastapi import APIRouter, Depends, Request, Response, Header, HTTPException, status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
 from src.database import database
 
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func, case, cast, Float, Integer, or_, and_
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import JSONB
 
 from pydantic import BaseModel
 
-from geoalchemy2.shape import to_shape
 
-import requests, json
 from typing import Optional, List
 
 from collections import defaultdict
 
-from korean_name_generator import namer
-
-from src.utils import generate_random_string, str_to_bool
+from src.utils import generate_random_string, str_to_bool, token_cache, share_tile_cache, autocomplete, share_admins, starred, share_serializer, pagination, etag
 
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-from passlib.hash import sha256_crypt
-from src.aws.secretManager import get_secret
 
 import logging
+import os
+import hashlib
 
 router = APIRouter()
 
@@ -61,192 +59,316 @@ logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def get_user_id(auth_token: str = Header(None), db: Session = Depends(database.get_db)):
-    stmt = select(database.LoginToken).where(database.LoginToken.token == auth_token)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+# 클러스터 한 칸의 크기 (화면 픽셀 기준)
+CLUSTER_CELL_PIXELS = int(os.getenv('CLUSTER_CELL_PIXELS') or 60)
+# zoom 과 grid_size 가 모두 없을 때 화면 가로를 나눌 칸 수
+CLUSTER_DEFAULT_COLUMNS = 12
+
+# 검색 결과 개수 (LIMIT)
+SEARCH_KEYWORDS_LIMIT = 20
+SEARCH_RESULTS_LIMIT = 100
+SEARCH_MAX_LIMIT = 500
+SHARE_LIST_LIMIT = 500
+SHARE_LIST_MAX_LIMIT = 2000
+STREAM_MAX_ROWS = int(os.getenv('STREAM_MAX_ROWS') or 100000)
+
+# 벡터 타일 응답의 Cache-Control max-age (초)
+VECTOR_TILE_MAX_AGE = int(os.getenv('VECTOR_TILE_MAX_AGE') or 60)
+VECTOR_TILE_MAX_ZOOM = 22
+SHARE_ITEM_MAX_AGE = int(os.getenv('SHARE_ITEM_MAX_AGE') or 10)
+
+async def get_user_id(auth_token: str = Header(None), db: AsyncSession = Depends(database.get_async_db), request: Request = None):
+    token_info = await token_cache.resolve_token_async(auth_token, db, request)
     
-    if row is None:
+    if token_info is None:
         return None
     
-    return User(id = row.user_id)
+    return User(id = token_info.user_id)
 
-@router.post('/share/list', tags=['share'])
-def get_share_list_with_bounds(bounds: MapBoundsInfo, db: Session = Depends(database.get_db), auth_token: str = Header(None)):
-    User = get_user_id(auth_token, db)
-
-    stmt = None
-
-    if User is None:
-        stmt = select(database.ShareInfo.id, 
-                        database.ShareInfo.name, 
-                        database.ShareInfo.admins,
-                        database.ShareInfo.contacts,
-                        database.ShareInfo.jibun_address,
-                        database.ShareInfo.doro_address,
-                        database.ShareInfo.point_lat,
-                        database.ShareInfo.point_lng,
-                        database.ShareInfo.point_name,
-                        database.ShareInfo.goods,
-                        database.ShareInfo.point,
-                        database.ShareInfo.status
-                    ).where(
-                        database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
-                        bounds.southwest.lng, bounds.southwest.lat, 
-                        bounds.northeast.lng, bounds.northeast.lat, 
-                        4326)), database.ShareInfo.is_deleted == False
-                    )
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
-    else: 
-        stmt = select(
-                    database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status,
-                    case(
-                        (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                        else_=False
-                    ).label('starred')
-                ).outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id).where(
-                    database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
-                    bounds.southwest.lng, bounds.southwest.lat, 
-                    bounds.northeast.lng, bounds.northeast.lat, 
-                4326)), database.ShareInfo.is_deleted == False)
+def name_contains(keyword: str):
+    """이름 부분 문자열 검색 조건. pg_trgm GIN 인덱스(ix_share_info_name_trgm)를 탑니다."""
+    escaped = keyword.replace('/', '//').replace('%', '/%').replace('_', '/_')
+
+    return database.ShareInfo.name.like(f"%{escaped}%", escape='/')
+
+def order_by_similarity(stmt, keyword: str, limit: int, offset: int, max_limit: int = SEARCH_MAX_LIMIT):
+    """검색어와 비슷한 순으로 정렬하고 LIMIT/OFFSET 을 적용합니다."""
+    return stmt.order_by(
+        func.similarity(database.ShareInfo.name, keyword).desc(),
+        database.ShareInfo.id
+    ).limit(max(1, min(limit, max_limit))).offset(max(0, offset))
+
+def group_keyword_results(share_infos) -> list:
+    """(id, name, doro_address, jibun_address, point_lat, point_lng) 목록을 같은 좌표끼리 묶습니다."""
+    # 결과를 처리할 객체 초기화
+    data = []
+    point_dict = defaultdict(list)  # (lat, lng) 키에 대해 주소와 이름 리스트를 저장
+
+    for row in share_infos:
+        id, name, doro_address, jibun_address, point_lat, point_lng = row
         
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "starred": result.starred,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
+        # (lat, lng) 튜플에 따라 저장
+        point_dict[(point_lat, point_lng)].append((name, doro_address, jibun_address, id))
+    
+    # 딕셔너리 순회
+    for point, values in point_dict.items():
+        if len(values) > 1:
+            # 겹치는 경우
+            count = len(values)
+            names, doro_addresses, jibun_addresses, ids = zip(*values)  # 언팩킹
+            # 예제에 따라 우선 첫번째(중복된) 정보를 사용하여 배열에 추가.
+            data.append({
+                "name": names[0], 
+                "doro_address": doro_addresses[0], 
+                "jibun_address": jibun_addresses[0],
+                "point_lat": point[0],
+                "point_lng": point[1],
+                "count": count,
+            })
+        else:
+            # 겹치지 않는 경우
+            single_value = values[0]
+            name, doro_address, jibun_address, id = single_value
+            data.append({"id": id, "name": name})
+
+    return data
+
+async def get_starred_share_ids(db: AsyncSession, user_id: int, share_ids: list) -> set:
+    if not share_ids:
+        return set()
+
+    stmt = select(database.StarredShare.share_id).where(
+        database.StarredShare.user_id == user_id,
+        database.StarredShare.share_id.in_(share_ids)
+    )
+    matched_rows = await db.execute(stmt)
+
+    return set(matched_rows.scalars().all())
+
+@router.post('/share/list', tags=['share'])
+async def get_share_list_with_bounds(
+    request: Request,
+    bounds: MapBoundsInfo,
+    cursor: Optional[int] = None,
+    limit: Optional[int] = None,
+    stream: Optional[str] = None,
+    db: AsyncSession = Depends(database.get_async_db),
+    auth_token: str = Header(None),
+    if_none_match: str = Header(None)
+):
+    User = await get_user_id(auth_token, db, request)
+    is_stream = str_to_bool.str_to_bool(stream)
+
+    if cursor is not None or limit is not None or is_stream:
+        # 커서/스트리밍 요청은 타일 캐시를 거치지 않고 id 순 keyset 으로 바로 조회합니다.
+        columns = share_serializer.share_columns()
+
+        if User is not None:
+            columns = (*columns, starred.is_starred(User.id).label('starred'))
+
+        stmt = select(*columns).where(
+            database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
+                bounds.southwest.lng, bounds.southwest.lat,
+                bounds.northeast.lng, bounds.northeast.lat,
+                4326)),
+            database.ShareInfo.is_deleted == False
+        ).order_by(database.ShareInfo.id)
+
+        if cursor is not None:
+            stmt = stmt.where(database.ShareInfo.id > cursor)
+
+        if is_stream:
+            # /search/results 스트리밍과 같이 STREAM_MAX_ROWS 를 넘지 않게 합니다.
+            return share_serializer.ndjson_response(stmt.limit(max(1, min(limit or STREAM_MAX_ROWS, STREAM_MAX_ROWS))))
+
+        limit = max(1, min(limit or SHARE_LIST_LIMIT, SHARE_LIST_MAX_LIMIT))
+        matched_rows = await db.execute(stmt.limit(limit))
+        response_data = [share_serializer.share_to_dict(result) for result in matched_rows.mappings().all()]
+
+        next_cursor = response_data[-1]["id"] if len(response_data) == limit else None
+
+        return share_serializer.success(response_data, next_cursor=next_cursor)
+
+    area = (bounds.southwest.lng, bounds.southwest.lat, bounds.northeast.lng, bounds.northeast.lat)
+
+    # ETag 는 응답에 담긴 나눔들의 (id, version) digest 입니다.
+    # 재검증 요청(If-None-Match)일 때만 DB 의 digest 로 확인해서, 304 는 워커별 캐시가 아니라 항상 DB 기준으로 줍니다.
+    digest = None
+
+    if if_none_match:
+        digest = await share_tile_cache.get_digest(db, *area)
+
+        if User is None:
+            # 비로그인 요청은 즐겨찾기가 없으므로 목록을 읽기 전에 304 를 판단할 수 있습니다.
+            headers = {"ETag": etag.make_etag(digest, False, ""), "Cache-Control": "no-cache"}
+
+            if etag.matches(if_none_match, headers["ETag"]):
+                return etag.not_modified(headers)
+
+    shares = await share_tile_cache.get_shares_in_bounds(db, *area)
+
+    if digest is not None and shares.digest != digest:
+        # 다른 워커의 수정으로 캐시가 낡았으면 이 영역의 타일을 다시 읽습니다.
+        shares = await share_tile_cache.get_shares_in_bounds(db, *area, refresh=True)
+
+    response_data = shares.rows
+
+    if not response_data:
+        return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
+
+    starred_ids = set()
+
+    if User is not None:
+        starred_ids = await get_starred_share_ids(db, User.id, [row["id"] for row in response_data])
+
+    # 나눔 (id, version) 과 즐겨찾기 여부가 같으면 같은 응답입니다.
+    headers = {
+        "ETag": etag.make_etag(shares.digest, User is not None, ",".join(map(str, sorted(starred_ids)))),
+        "Cache-Control": "private, no-cache" if User is not None else "no-cache",
+    }
+
+    if etag.matches(if_none_match, headers["ETag"]):
+        return etag.not_modified(headers)
+
+    if User is not None:
+        response_data = [{**row, "starred": row["id"] in starred_ids} for row in response_data]
+
+    return share_serializer.success(response_data, headers=headers)
+
+@router.post('/share/clusters', tags=['share'])
+async def get_share_clusters_with_bounds(
+    bounds: MapBoundsInfo,
+    zoom: Optional[int] = None,
+    grid_size: Optional[float] = None,
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    if grid_size is None and zoom is not None:
+        # 해당 줌 레벨에서 CLUSTER_CELL_PIXELS 픽셀이 차지하는 경도 폭
+        grid_size = 360 * CLUSTER_CELL_PIXELS / (256 * 2 ** max(0, min(zoom, 24)))
+    elif grid_size is None:
+        grid_size = abs(bounds.northeast.lng - bounds.southwest.lng) / CLUSTER_DEFAULT_COLUMNS
+
+    if grid_size <= 0:
+        return JSONResponse(content=jsonable_encoder({"error": "잘못된 그리드 크기입니다."}))
+
+    # 격자 칸 + 상태별로 먼저 묶은 뒤, 격자 칸 단위로 다시 합칩니다.
+    cell = func.ST_SnapToGrid(database.ShareInfo.point, grid_size).label('cell')
+    per_status = (
+        select(
+            cell,
+            database.ShareInfo.status,
+            func.count().label('count'),
+            func.sum(func.ST_X(database.ShareInfo.point)).label('sum_lng'),
+            func.sum(func.ST_Y(database.ShareInfo.point)).label('sum_lat'),
+            func.min(database.ShareInfo.id).label('share_id')
+        ).where(
+            database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
+            bounds.southwest.lng, bounds.southwest.lat, 
+            bounds.northeast.lng, bounds.northeast.lat, 
+            4326)), database.ShareInfo.is_deleted == False
+        ).group_by(cell, database.ShareInfo.status)
+    ).subquery()
+
+    total = func.sum(per_status.c.count)
+    stmt = select(
+        cast(func.sum(per_status.c.sum_lng) / total, Float).label('lng'),
+        cast(func.sum(per_status.c.sum_lat) / total, Float).label('lat'),
+        cast(total, Integer).label('count'),
+        func.jsonb_object_agg(func.coalesce(per_status.c.status, 0), per_status.c.count, type_=JSONB).label('statuses'),
+        func.min(per_status.c.share_id).label('share_id')
+    ).group_by(per_status.c.cell)
+
+    matched_rows = await db.execute(stmt)
+    results = matched_rows.mappings().all()
+
+    if not results:
+        return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
+
+    response_data = []
+    for result in results:
+        row_dict = {
+            "lat": result.lat,
+            "lng": result.lng,
+            "count": result.count,
+            "statuses": result.statuses,
+        }
+
+        # 나눔이 하나뿐인 클러스터는 해당 나눔 id 로 펼칩니다.
+        if result.count == 1:
+            row_dict["id"] = result.share_id
+
+        response_data.append(row_dict)
+
+    return JSONResponse(content=jsonable_encoder({"success": {"grid_size": grid_size, "clusters": response_data}}))
+
+@router.get('/share/tiles/{z}/{x}/{y}.mvt', tags=['share'])
+async def get_share_vector_tile(z: int, x: int, y: int, if_none_match: str = Header(None), db: AsyncSession = Depends(database.get_async_db)):
+    if not (0 <= z <= VECTOR_TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tile out of range")
+
+    envelope = func.ST_TileEnvelope(z, x, y)
+    mvt_geom = select(
+        func.ST_AsMVTGeom(func.ST_Transform(database.ShareInfo.point, 3857), envelope).label('geom'),
+        database.ShareInfo.id,
+        database.ShareInfo.status,
+        database.ShareInfo.name
+    ).where(
+        database.ShareInfo.point.ST_Intersects(func.ST_Transform(envelope, 4326)),
+        database.ShareInfo.is_deleted == False
+    ).subquery('mvtgeom')
+
+    stmt = select(func.ST_AsMVT(mvt_geom.table_valued(), 'shares'))
+    matched_row = await db.execute(stmt)
+    tile = bytes(matched_row.scalar() or b'')
+
+    headers = {
+        "Cache-Control": f"public, max-age={VECTOR_TILE_MAX_AGE}",
+        "ETag": f'"{hashlib.md5(tile).hexdigest()}"',
+    }
+
+    if etag.matches(if_none_match, headers["ETag"]):
+        return etag.not_modified(headers)
+
+    return Response(content=tile, media_type="application/vnd.mapbox-vector-tile", headers=headers)
 
 @router.get('/share/item/{id}', tags=['share']) 
-def get_share_item_by_id(id: int, db: Session = Depends(database.get_db), auth_token: str = Header(None)):
-    User = get_user_id(auth_token, db)
+async def get_share_item_by_id(request: Request, id: int, db: AsyncSession = Depends(database.get_async_db), auth_token: str = Header(None), if_none_match: str = Header(None)):
+    User = await get_user_id(auth_token, db, request)
     
-    stmt = None
-
-    if User is None:
-        # 좋아요 정보 가져오지 못함
-        stmt = select(database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status
-                    ).where(database.ShareInfo.id == id, database.ShareInfo.is_deleted == False)
-    else:
+    columns = share_serializer.share_columns()
+
+    if User is not None:
         # 좋아요 정보 가져옴
-        stmt = (
-            select(
-                database.ShareInfo.id, 
-                database.ShareInfo.name, 
-                database.ShareInfo.admins,
-                database.ShareInfo.contacts,
-                database.ShareInfo.jibun_address,
-                database.ShareInfo.doro_address,
-                database.ShareInfo.point_lat,
-                database.ShareInfo.point_lng,
-                database.ShareInfo.point_name,
-                database.ShareInfo.goods,
-                database.ShareInfo.point,
-                database.ShareInfo.status,
-                case(
-                    (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                    else_=False
-                ).label('starred')
-            )
-            .outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id)
-            .where(database.ShareInfo.id == id, database.ShareInfo.is_deleted == False)
-        )
-    
+        columns = (*columns, starred.is_starred(User.id).label('starred'))
 
-    matched_row = db.execute(stmt)
-    result = matched_row.fetchone()
+    stmt = select(*columns).where(database.ShareInfo.id == id, database.ShareInfo.is_deleted == False)
+
+    matched_row = await db.execute(stmt)
+    result = matched_row.mappings().first()
 
     if result is None:
         return JSONResponse(content=jsonable_encoder({"error": "데이터가 없습니다."}))
-    
-    column_names = [
-        "id", "name", "admins", "contacts", "jibun_address", "doro_address",
-        "point_lat", "point_lng", "point_name", "goods", "point", "status", "starred"
-    ]
 
-    row_dict = dict(zip(column_names, result))
+    # 로그인한 경우 즐겨찾기 여부가 들어가므로 공유 캐시(nginx)에 저장되지 않게 합니다.
+    headers = {
+        "ETag": etag.make_etag(result.id, result.version, result.starred if User is not None else None),
+        "Cache-Control": "private, no-cache" if User is not None else f"public, max-age={SHARE_ITEM_MAX_AGE}",
+    }
 
-    row_dict["point"] = to_shape(row_dict["point"]).__geo_interface__
+    if etag.matches(if_none_match, headers["ETag"]):
+        return etag.not_modified(headers)
 
-    return JSONResponse(content=jsonable_encoder({"success": row_dict}))
+    return share_serializer.success(share_serializer.share_to_dict(result), headers=headers)
 
 @router.patch('/share/contacts/{id}', tags=['app'])
 def change_share_contacts(shareInfo: ShareChangeInfo, db: Session = Depends(database.get_db)):
-    stmt = select(database.ShareInfo).where(database.ShareInfo.id == shareInfo.id)
-    matchedRow = db.execute(stmt)
-    row = matchedRow.scalars().first()
+    row, is_admin = share_admins.get_share_with_permission(db, shareInfo.id, shareInfo.tag)
     
     if row is None:
         return JSONResponse(content=jsonable_encoder({"error": "해당 나눔 데이터가 없습니다."}))
-    
-    admins = list(map(int, row.admins.split(",")))
 
-    if shareInfo.tag in admins:
+    if is_admin:
+        share_tile_cache.invalidate_point(row.point_lat, row.point_lng, db)
         db.query(database.ShareInfo).filter(database.ShareInfo.id == shareInfo.id).update({'contacts': shareInfo.contacts})
         db.commit()
 
@@ -262,250 +384,104 @@ def get_like_search_keywords_with_keyword(
     southwest_lat: Optional[float] = None,
     northeast_lng: Optional[float] = None,
     northeast_lat: Optional[float] = None, 
+    limit: int = SEARCH_KEYWORDS_LIMIT,
+    offset: int = 0,
     db: Session = Depends(database.get_db)
 ):
     is_map_only = str_to_bool.str_to_bool(map_only)
-    
+
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    offset = max(0, offset)
+
+    # 인덱스가 준비되어 있으면 DB 를 거치지 않고 메모리에서 찾습니다.
+    if autocomplete.index.ready:
+        bounds = (southwest_lng, southwest_lat, northeast_lng, northeast_lat) if is_map_only else None
+
+        if bounds is not None and None in bounds:
+            bounds = None
+
+        entries = autocomplete.index.search(keyword, bounds, offset + limit)[offset:]
+
+        return JSONResponse(content=jsonable_encoder({"success": group_keyword_results([entry.as_row() for entry in entries])}))
+
     results = None
 
     if is_map_only is False:
         results = db.query(database.ShareInfo).with_entities(database.ShareInfo.id, database.ShareInfo.name, database.ShareInfo.doro_address, database.ShareInfo.jibun_address,
-               database.ShareInfo.point_lat, database.ShareInfo.point_lng).filter(database.ShareInfo.name.like(f"%{keyword}%"))
+               database.ShareInfo.point_lat, database.ShareInfo.point_lng).filter(name_contains(keyword), database.ShareInfo.is_deleted == False)
     else:
         results = db.query(database.ShareInfo).with_entities(database.ShareInfo.id, database.ShareInfo.name, database.ShareInfo.doro_address, database.ShareInfo.jibun_address,
-               database.ShareInfo.point_lat, database.ShareInfo.point_lng).filter(database.ShareInfo.name.like(f"%{keyword}%"), database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(southwest_lng, southwest_lat, northeast_lng, northeast_lat, 4326)))
+               database.ShareInfo.point_lat, database.ShareInfo.point_lng).filter(name_contains(keyword), database.ShareInfo.is_deleted == False, database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(southwest_lng, southwest_lat, northeast_lng, northeast_lat, 4326)))
 
-    share_infos = results.all()
-
-    # 결과를 처리할 객체 초기화
-    data = []
-    point_dict = defaultdict(list)  # (lat, lng) 키에 대해 주소와 이름 리스트를 저장
+    share_infos = order_by_similarity(results, keyword, limit, offset).all()
 
-    for row in share_infos:
-        id, name, doro_address, jibun_address, point_lat, point_lng = row
-        
-        # (lat, lng) 튜플에 따라 저장
-        point_dict[(point_lat, point_lng)].append((name, doro_address, jibun_address, id))
-    
-    # 딕셔너리 순회
-    for point, values in point_dict.items():
-        if len(values) > 1:
-            # 겹치는 경우
-            count = len(values)
-            names, doro_addresses, jibun_addresses, ids = zip(*values)  # 언팩킹
-            # 예제에 따라 우선 첫번째(중복된) 정보를 사용하여 배열에 추가.
-            data.append({
-                "name": names[0], 
-                "doro_address": doro_addresses[0], 
-                "jibun_address": jibun_addresses[0],
-                "point_lat": point[0],
-                "point_lng": point[1],
-                "count": count,
-            })
-        else:
-            # 겹치지 않는 경우
-            single_value = values[0]
-            name, doro_address, jibun_address, id = single_value
-            data.append({"id": id, "name": name})
+    data = group_keyword_results(share_infos)
 
     return JSONResponse(content=jsonable_encoder({"success": data}))
 
 @router.get('/search/results/{keyword}', tags=['app'])
-def get_search_results(
+async def get_search_results(
+    request: Request,
     keyword: str, 
     map_only: Optional[str] = None,
     southwest_lng: Optional[float] = None,
     southwest_lat: Optional[float] = None,
     northeast_lng: Optional[float] = None,
     northeast_lat: Optional[float] = None, 
-    db: Session = Depends(database.get_db),
+    limit: int = SEARCH_RESULTS_LIMIT,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    stream: Optional[str] = None,
+    db: AsyncSession = Depends(database.get_async_db),
     auth_token: str = Header(None)
 ):
     is_map_only = str_to_bool.str_to_bool(map_only)
-    results = None
-    User = get_user_id(auth_token, db)
-    stmt = None
+    is_stream = str_to_bool.str_to_bool(stream)
+    User = await get_user_id(auth_token, db, request)
 
     logger.info(f"Received request for item_id: {keyword} with query")
 
-    if User is None and is_map_only is True:
-        stmt = select(database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status
-                    ).where(
-                    database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
-                    southwest_lng, southwest_lat, 
-                    northeast_lng, northeast_lat, 
-                    4326), database.ShareInfo.is_deleted == False, database.ShareInfo.name.like(f"%{keyword}%"))
-            )
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
-    elif User is not None and is_map_only is True: 
-        stmt = select(
-                    database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status,
-                    case(
-                        (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                        else_=False
-                    ).label('starred')
-                ).outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id).where(
-                    database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
-                    southwest_lng, southwest_lat, 
-                    northeast_lng, northeast_lat, 
-                4326)), database.ShareInfo.is_deleted == False, database.ShareInfo.name.like(f"%{keyword}%"))
-        
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "starred": result.starred,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
-    elif User is None and is_map_only is False:
-        stmt = select(database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status
-                    ).where(database.ShareInfo.is_deleted == False, database.ShareInfo.name.like(f"%{keyword}%"))
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
-    else:
-        stmt = select(
-                    database.ShareInfo.id, 
-                    database.ShareInfo.name, 
-                    database.ShareInfo.admins,
-                    database.ShareInfo.contacts,
-                    database.ShareInfo.jibun_address,
-                    database.ShareInfo.doro_address,
-                    database.ShareInfo.point_lat,
-                    database.ShareInfo.point_lng,
-                    database.ShareInfo.point_name,
-                    database.ShareInfo.goods,
-                    database.ShareInfo.point,
-                    database.ShareInfo.status,
-                    case(
-                        (database.StarredShare.share_id == database.ShareInfo.id and database.StarredShare.user_id == User.id, True),
-                        else_=False
-                    ).label('starred')
-                ).outerjoin(database.StarredShare, database.ShareInfo.id == database.StarredShare.share_id).where(
-                    database.ShareInfo.is_deleted == False, database.ShareInfo.name.like(f"%{keyword}%"))
-        
+    similarity = func.similarity(database.ShareInfo.name, keyword)
+    columns = (*share_serializer.share_columns(), similarity.label('similarity'))
+
+    if User is not None:
+        columns = (*columns, starred.is_starred(User.id).label('starred'))
+
+    stmt = select(*columns).where(database.ShareInfo.is_deleted == False, name_contains(keyword))
+
+    if is_map_only is True:
+        stmt = stmt.where(database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(
+            southwest_lng, southwest_lat,
+            northeast_lng, northeast_lat,
+            4326)))
+
+    if cursor is not None:
+        # (similarity desc, id) 순서에서 커서 다음 row 부터
+        try:
+            last_similarity, last_id = pagination.decode_cursor(cursor, (float, int))
+        except ValueError:
+            return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder({"error": "잘못된 커서입니다."}))
+
+        stmt = stmt.where(or_(
+            similarity < last_similarity,
+            and_(similarity == last_similarity, database.ShareInfo.id > last_id)
+        ))
+        offset = 0
+
+    if is_stream:
+        # 스트리밍은 페이지 크기(limit) 없이 STREAM_MAX_ROWS 까지 내보냅니다.
+        return share_serializer.ndjson_response(order_by_similarity(stmt, keyword, STREAM_MAX_ROWS, offset, STREAM_MAX_ROWS))
+
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    matched_rows = await db.execute(order_by_similarity(stmt, keyword, limit, offset))
+    results = matched_rows.mappings().all()
+
+    if not results:
+        return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
+
+    next_cursor = None
+
+    if len(results) == limit:
+        next_cursor = pagination.encode_cursor(results[-1].similarity, results[-1].id)
 
-        matched_rows = db.execute(stmt)
-        results = matched_rows.mappings().all()
-
-        if not results:
-            return JSONResponse(content=jsonable_encoder({"error": "구역 내부에 값이 없습니다."}))
-
-        response_data = []
-        for result in results:
-            row_dict = {
-                "id": result.id,
-                "name": result.name,
-                "admins": result.admins,
-                "contacts": result.contacts,
-                "jibun_address": result.jibun_address,
-                "doro_address": result.doro_address,
-                "point_lat": result.point_lat,
-                "point_lng": result.point_lng,
-                "point_name": result.point_name,
-                "goods": result.goods,
-                "status": result.status,
-                "starred": result.starred,
-                "point": to_shape(result.point).__geo_interface__ if result.point else None
-            }
-            response_data.append(row_dict)
-
-        return JSONResponse(content=jsonable_encoder({"success": response_data}))
\ No newline at end of file
+    return share_serializer.success([share_serializer.share_to_dict(result) for result in results], next_cursor=next_cursor)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, WebSocket
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 
@@ -12,21 +12,14 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from src.utils import generate_random_string
+from src.utils.mailer import send_mail
+from src.utils import verify_hub
 
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-
 import traceback
 
-from src.aws.secretManager import get_secret
-
-import socketio
-import websockets
-
 class VerifyEmailToken(BaseModel):
     email: str
 
@@ -54,25 +47,6 @@ def send_change_password_email(info: ChangePassword, db: Session = Depends(datab
 
     verifyToken = generate_random_string.id_generator(20)
 
-    email_account_auth_info = get_secret('candleHelper/Account/VerifyEmailSender')
-
-    msg = MIMEMultipart('alternative')
-    msg['From'] = email_account_auth_info['email']
-    msg['To'] = email
-    msg['Subject'] = '나눔사 비밀번호 재설정 메일입니다.'
-
-    html = MIMEText('다음의 버튼을 클릭하시면 비밀번호 재설정 화면으로 이동합니다.<br />원하지 않으시면 이 메일을 무시해주세요.<br /><br /><form action="%s" target="_blank method="get"><input id="token" type="hidden" name="token" value="%s" /><input type="submit" value="비밀번호 변경하기" /></form>' % (os.getenv("HOST") + "/change/password" or "http://localhost/change/password",verifyToken), 'html')
-
-    msg.attach(html)
-
-    server = smtplib.SMTP_SSL('smtp.naver.com', 465)
-    server.ehlo()
-    # server.starttls()
-    
-    server.login(email_account_auth_info['id'], email_account_auth_info['password'])
-    server.sendmail(email_account_auth_info['email'], [email], msg.as_string())
-    server.quit()
-
     db.query(database.ResetPassword).filter(database.ResetPassword.email == info.email).delete()
     db.commit()
 
@@ -80,6 +54,12 @@ def send_change_password_email(info: ChangePassword, db: Session = Depends(datab
     db.add(emailVerifyData)
     db.commit()
 
+    html = '다음의 버튼을 클릭하시면 비밀번호 재설정 화면으로 이동합니다.<br />원하지 않으시면 이 메일을 무시해주세요.<br /><br /><form action="%s" target="_blank method="get"><input id="token" type="hidden" name="token" value="%s" /><input type="submit" value="비밀번호 변경하기" /></form>' % (os.getenv("HOST") + "/change/password" or "http://localhost/change/password",verifyToken)
+
+    # 메일은 백그라운드 워커가 보냅니다. (src/utils/mailer.py)
+    if not send_mail(email, '나눔사 비밀번호 재설정 메일입니다.', html):
+        return JSONResponse(content=jsonable_encoder({"error": "이메일 발송에 실패했습니다. 잠시 후 다시 시도해주세요."}))
+
     return JSONResponse(content=jsonable_encoder({"success": "비밀번호 변경 이메일 발송에 성공했습니다."}))
  
 @router.post("/verify/email/token", tags=['verify'])
@@ -87,25 +67,6 @@ def send_verify_email_and_save_data(email: VerifyEmailToken, db: Session = Depen
     email = email.email
     verifyToken = generate_random_string.id_generator(20)
 
-    email_account_auth_info = get_secret('candleHelper/Account/VerifyEmailSender')
-
-    msg = MIMEMultipart('alternative')
-    msg['From'] = email_account_auth_info['email']
-    msg['To'] = email
-    msg['Subject'] = '나눔사 인증 메일입니다.'
-
-    html = MIMEText('다음의 버튼을 클릭하시면 인증 화면으로 이동합니다.<br />인증을 원하지 않으시면 이 메일을 무시해주세요.<br /><br /><form action="%s" target="_blank method="get"><input id="token" type="hidden" name="token" value="%s" /><input type="submit" value="인증하기" /></form>' % (os.getenv("HOST") + "/verify/email" or "http://localhost/verify/email", verifyToken), 'html')
-
-    msg.attach(html)
-
-    server = smtplib.SMTP_SSL('smtp.naver.com', 465)
-    server.ehlo()
-    # server.starttls()
-    
-    server.login(email_account_auth_info['id'], email_account_auth_info['password'])
-    server.sendmail(email_account_auth_info['email'], [email], msg.as_string())
-    server.quit()
-
     db.query(database.EmailVerify).filter(database.EmailVerify.email == email).delete()
     db.commit()
 
@@ -113,6 +74,11 @@ def send_verify_email_and_save_data(email: VerifyEmailToken, db: Session = Depen
     db.add(emailVerifyData)
     db.commit()
 
+    html = '다음의 버튼을 클릭하시면 인증 화면으로 이동합니다.<br />인증을 원하지 않으시면 이 메일을 무시해주세요.<br /><br /><form action="%s" target="_blank method="get"><input id="token" type="hidden" name="token" value="%s" /><input type="submit" value="인증하기" /></form>' % (os.getenv("HOST") + "/verify/email" or "http://localhost/verify/email", verifyToken)
+
+    if not send_mail(email, '나눔사 인증 메일입니다.', html):
+        return JSONResponse(content=jsonable_encoder({"error": "이메일 발송에 실패했습니다. 잠시 후 다시 시도해주세요."}))
+
     return JSONResponse(content=jsonable_encoder({"token": verifyToken}))
 
 @router.post("/verify/email", tags=['verify'])
@@ -123,45 +89,28 @@ def make_email_verify_with_token(token:VerifyEmail, db: Session = Depends(databa
 
     if row and row.is_verified is False:
         
-        # socket.io 클라이언트 생성
-        session_cookie = token.token
-        sio = socketio.Client()
-
-        @sio.on('*')
-        def any_event(event, sid, data):
-            print(event)
-            print(sid)
-            print(data)
-
-        # 서버와의 연결 이벤트 핸들러
-        @sio.event
-        def connect():
-            print('Connection established')
-
-        # 연결 해제 이벤트 핸들러
-        @sio.event
-        def disconnect():
-            print('Disconnected from server')
-
-        @sio.event
-        def connect_error(message):
-            print('Connection was rejected due to ' + message)
-
-        sio.connect('url', transports=['websocket'], wait_timeout=10, wait=True)
-        sio.send(token.token)
-
-        @sio.event
-        def acknowledged(message):
-            print('Acknowledged by server:', message)
-            # 연결 종료
-            sio.disconnect()
-
         db.query(database.EmailVerify).filter(database.EmailVerify.token == token.token).update({'is_verified': True, 'edited_at': 'NOW()'}, synchronize_session = False)
         db.commit()
 
+        # 가입 화면이 기다리고 있으면 알립니다.
+        verify_hub.hub.publish_threadsafe(token.token, {"event": "verified", "email": row.email})
+
         return JSONResponse(content=jsonable_encoder({"email": row.email}))
     elif row and row.is_verified is True:
         return JSONResponse(content=jsonable_encoder({"result": 0}))
     else:
         return JSONResponse(content=jsonable_encoder({"result": 1}))
-    
\ No newline at end of file
+
+@router.websocket("/verify/email/ws/{token}")
+async def wait_email_verify(websocket: WebSocket, token: str):
+    async def already_verified():
+        # 연결하기 전에 인증이 끝났으면 바로 알립니다.
+        async with database.async_session() as db:
+            stmt = select(database.EmailVerify.email).where(
+                database.EmailVerify.token == token, database.EmailVerify.is_verified.is_(True)
+            )
+            email = (await db.execute(stmt)).scalar()
+
+        return {"event": "verified", "email": email} if email is not None else None
+
+    await verify_hub.hub.wait(websocket, token, already_verified)
@@ -1,27 +1,90 @@
 from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 
 import os
 import logging
 
 from sqlalchemy.sql import func
 
-from sqlalchemy import Boolean, Column, Integer, String, Time, DateTime, Sequence, Float
+from sqlalchemy import Boolean, Column, Integer, String, Time, DateTime, Sequence, Float, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from geoalchemy2 import Geometry
 
 from src.aws.secretManager import get_secret
+from src.database.pool_metrics import InstrumentedQueuePool, InstrumentedAsyncAdaptedQueuePool, instrument_pool
+from src.database import query_diagnostics
+from src.utils.str_to_bool import str_to_bool
 
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-connection_info = get_secret('candleHelper/DB/postgres/prod')
+DB_SECRET_NAME = 'candleHelper/DB/postgres/prod'
 
-engine = create_engine(f'postgresql://{connection_info["username"]}:{connection_info["password"]}@{os.getenv("POSTGRESQL_HOST") or "localhost"}:{os.getenv("POSTGRESQL_PORT") or "5432"}/{connection_info["dbname"]}')
-session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
+def get_database_location(connection_info: dict) -> str:
+    return f'{connection_info["username"]}:{connection_info["password"]}@{os.getenv("POSTGRESQL_HOST") or "localhost"}:{os.getenv("POSTGRESQL_PORT") or "5432"}/{connection_info["dbname"]}'
+
+def get_pool_settings() -> dict:
+    """
+    커넥션 풀 설정을 환경변수에서 읽습니다.
+
+    DB_POOL_SIZE 를 지정하지 않고 DB_MAX_CONNECTIONS 만 지정하면, 전체 커넥션 수를
+    워커 수(WEB_CONCURRENCY)와 워커당 엔진 수(동기/비동기 2개)로 나눠 풀 크기를 정합니다.
+    """
+    workers = int(os.getenv("WEB_CONCURRENCY") or 1)
+    max_connections = os.getenv("DB_MAX_CONNECTIONS")
+    per_pool = max(1, int(max_connections) // (workers * 2)) if max_connections else None
+
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE") or per_pool or 5),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW") or (0 if per_pool else 10)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE") or 1800),
+        "pool_pre_ping": str_to_bool(os.getenv("DB_POOL_PRE_PING") or "true"),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT") or 30),
+    }
+
+pool_settings = get_pool_settings()
+logger.info(f"Database pool settings: {pool_settings}")
+
+# 엔진은 import 시점이 아니라 init_engines() 에서 만듭니다. (앱은 lifespan 에서, 마이그레이션은 env.py 에서 호출)
+# 세션 팩토리는 미리 만들어 두고 엔진이 생기면 bind 합니다.
+engine = None
+session = scoped_session(sessionmaker(autocommit=False, autoflush=False))
+
+# 읽기 위주 엔드포인트용 비동기 엔진 (asyncpg)
+async_engine = None
+async_session = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def init_engines(connection_info: dict = None):
+    """DB 시크릿으로 동기/비동기 엔진을 만들고 세션 팩토리에 연결합니다. 이미 만들었으면 아무것도 하지 않습니다."""
+    global engine, async_engine
+
+    if engine is not None:
+        return
+
+    database_location = get_database_location(connection_info or get_secret(DB_SECRET_NAME))
+
+    engine = create_engine(f'postgresql://{database_location}', poolclass=InstrumentedQueuePool, pool_logging_name="sync", **pool_settings)
+    instrument_pool(engine.pool, "sync")
+    session.configure(bind=engine)
+
+    async_engine = create_async_engine(f'postgresql+asyncpg://{database_location}', poolclass=InstrumentedAsyncAdaptedQueuePool, pool_logging_name="async", **pool_settings)
+    instrument_pool(async_engine.sync_engine.pool, "async")
+    async_session.configure(bind=async_engine)
+
+    if query_diagnostics.DB_DIAGNOSTICS:
+        query_diagnostics.install(engine)
+        query_diagnostics.install(async_engine.sync_engine)
+
+async def dispose_engines():
+    if async_engine is not None:
+        await async_engine.dispose()
+
+    if engine is not None:
+        engine.dispose()
 
 def get_db():
     db = session()
@@ -31,8 +94,11 @@ def get_db():
     finally:
     	db.close()
 
+async def get_async_db():
+    async with async_session() as db:
+        yield db
+
 Base = declarative_base()
-Base.metadata.create_all(bind=engine)
 
 class EmailVerify(Base):
     __tablename__ = "email_verify"
@@ -70,6 +136,11 @@ class LoginToken(Base):
 
 class ShareInfo(Base):
     __tablename__ = "share_info"
+    __table_args__ = tuple(
+        # 부분 문자열 검색(LIKE '%keyword%')용 pg_trgm 인덱스
+        Index(f'ix_share_info_{column}_trgm', column, postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+        for column in ('name', 'point_name', 'jibun_address', 'doro_address')
+    )
 
     id = Column(Integer, Sequence('share_item_id_seq', start=0), primary_key=True)
 
@@ -87,9 +158,25 @@ class ShareInfo(Base):
     edited_at = Column(DateTime)
     status = Column(Integer,  default=0)
     is_deleted = Column(Boolean, default=False)
+    # 수정될 때마다 DB 트리거가 1씩 올립니다. (ETag 계산용)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+
+class ShareAdmins(Base):
+    __tablename__ = "share_admins"
+    __table_args__ = (
+        # 유저 tag 로 관리 중인 나눔을 찾을 때 사용
+        Index('ix_share_admins_user_tag_share_id', 'user_tag', 'share_id'),
+    )
+
+    share_id = Column(Integer, primary_key=True)
+    user_tag = Column(Integer, primary_key=True)
 
 class RecentSearchKeywords(Base):
     __tablename__ = "recent_search_keywords"
+    __table_args__ = (
+        Index('ux_recent_search_keywords_user_id_keyword', 'user_id', 'keyword', unique=True),
+        Index('ix_recent_search_keywords_user_id_created_at', 'user_id', text('created_at DESC')),
+    )
 
     id = Column(Integer, Sequence('recent_search_keywords_id_seq', start=0), primary_key=True)
     user_id = Column(Integer)
@@ -99,6 +186,9 @@ class RecentSearchKeywords(Base):
 
 class StarredShare(Base):
     __tablename__ = "starred_share"
+    __table_args__ = (
+        Index('ux_starred_share_user_id_share_id', 'user_id', 'share_id', unique=True),
+    )
 
     id = Column(Integer, Sequence('starred_share_id_seq', start=0), primary_key=True)
     share_id = Column(Integer)
@@ -113,6 +203,15 @@ class ResetPassword(Base):
     email = Column(String, nullable=False)
     edited_at = edited_at = Column(DateTime)
 
+class GeocodeCache(Base):
+    __tablename__ = "geocode_cache"
+
+    # 공백을 정리한 지번 주소
+    address = Column(String, primary_key=True)
+    lat = Column(Float, nullable=False)
+    lng = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=func.now())
+
 
 def object_as_dict(obj):
     return {
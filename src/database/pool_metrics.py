@@ -0,0 +1,81 @@
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+import time
+
+from src.utils import metrics
+
+# 커넥션 풀 메트릭 (pool 라벨: sync / async)
+
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+pool_checkouts = metrics.counter("db_pool_checkouts_total", "Connections checked out of the pool", ("pool",))
+pool_checkins = metrics.counter("db_pool_checkins_total", "Connections returned to the pool", ("pool",))
+pool_connects = metrics.counter("db_pool_connects_total", "New DBAPI connections opened by the pool", ("pool",))
+pool_invalidations = metrics.counter("db_pool_invalidations_total", "Connections invalidated by the pool", ("pool",))
+pool_timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that failed with QueuePool limit reached", ("pool",))
+
+pool_wait_seconds = metrics.histogram("db_pool_wait_seconds", "Time spent waiting for a pooled connection", ("pool",), buckets=POOL_WAIT_BUCKETS)
+pool_hold_seconds = metrics.histogram("db_pool_hold_seconds", "Time a connection stayed checked out", ("pool",), buckets=POOL_WAIT_BUCKETS)
+
+pool_size = metrics.gauge("db_pool_size", "Configured pool size", ("pool",))
+pool_checked_out = metrics.gauge("db_pool_checked_out", "Connections currently checked out", ("pool",))
+pool_overflow = metrics.gauge("db_pool_overflow", "Current overflow connections", ("pool",))
+pool_checked_in = metrics.gauge("db_pool_checked_in", "Idle connections in the pool", ("pool",))
+
+class _InstrumentedPoolMixin:
+    """커넥션을 얻기까지 기다린 시간과 타임아웃 횟수를 기록합니다."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc(pool=self.logging_name)
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start, pool=self.logging_name)
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_pool(pool, name: str):
+    """풀 이벤트를 메트릭으로 연결합니다."""
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_connects.inc(pool=name)
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        pool_checkouts.inc(pool=name)
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        pool_checkins.inc(pool=name)
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+
+        if checked_out_at is not None:
+            pool_hold_seconds.observe(time.perf_counter() - checked_out_at, pool=name)
+
+    @event.listens_for(pool, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_invalidations.inc(pool=name)
+
+    pool_size.set_function(pool.size, pool=name)
+    pool_checked_out.set_function(pool.checkedout, pool=name)
+    pool_overflow.set_function(pool.overflow, pool=name)
+    pool_checked_in.set_function(pool.checkedin, pool=name)
+
+def pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
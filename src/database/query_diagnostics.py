@@ -0,0 +1,198 @@
+from sqlalchemy import event
+
+import hashlib
+import logging
+import os
+import random
+import re
+import time
+
+from src.utils import metrics, request_metrics
+from src.utils.str_to_bool import str_to_bool
+
+# 쿼리 진단 모드 (DB_DIAGNOSTICS=true 일 때만 init_engines() 에서 엔진에 붙입니다)
+# - DB_SLOW_QUERY_MS 보다 오래 걸린 쿼리를 바인드 파라미터와 함께 로그로 남깁니다.
+#   DB_SLOW_QUERY_EXPLAIN_RATE 비율만큼은 같은 커넥션에서 실행 계획도 남깁니다.
+#   부작용 없는 SELECT 는 EXPLAIN (ANALYZE, BUFFERS), 나머지(DML, FOR UPDATE, nextval 등)는 실행하지 않는 EXPLAIN 만 씁니다.
+# - 한 요청에서 같은 모양의 쿼리를 DB_N_PLUS_ONE_THRESHOLD 번 넘게 보내면 N+1 로 보고 경고를 남깁니다.
+# - DB_DIAGNOSTICS_HEADER=true 면 요청별 요약을 X-DB-Diagnostics 응답 헤더로 붙입니다. (디버그용)
+DB_DIAGNOSTICS = str_to_bool(os.getenv('DB_DIAGNOSTICS') or 'false')
+DB_DIAGNOSTICS_HEADER = str_to_bool(os.getenv('DB_DIAGNOSTICS_HEADER') or 'false')
+DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS') or 200)
+DB_SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('DB_SLOW_QUERY_EXPLAIN_RATE') or 0)
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv('DB_N_PLUS_ONE_THRESHOLD') or 5)
+# 로그에 남길 SQL / 파라미터 최대 길이
+DB_DIAGNOSTICS_MAX_LENGTH = int(os.getenv('DB_DIAGNOSTICS_MAX_LENGTH') or 2000)
+
+HEADER_NAME = b"x-db-diagnostics"
+# 이 이름이 들어간 바인드 파라미터는 로그에 값을 남기지 않습니다.
+# 이름이 없는 위치 파라미터(asyncpg)는 어떤 값인지 알 수 없으므로 값 대신 타입만 남깁니다.
+SENSITIVE_PARAMETER = re.compile(r"password|token|secret|uid|email", re.IGNORECASE)
+# 다시 실행하면 안 되는 SELECT (행 잠금, 시퀀스 증가)
+_SIDE_EFFECTS = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+)?(?:UPDATE|SHARE)\b|\bFOR\s+KEY\s+SHARE\b|\b(?:nextval|setval)\s*\(", re.IGNORECASE)
+
+# IN (...) 의 바인드 개수나 공백 차이로 모양이 갈리지 않도록 정리합니다.
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%\(\w+\)s|%s|\$\d+)(?:\s*,\s*(?:%\(\w+\)s|%s|\$\d+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+logger = logging.getLogger(__name__)
+
+slow_queries_total = metrics.counter("db_slow_queries_total", "Queries slower than DB_SLOW_QUERY_MS")
+explains_total = metrics.counter("db_slow_query_explains_total", "EXPLAIN samples taken for slow queries", ("result",))
+n_plus_one_total = metrics.counter("db_n_plus_one_requests_total", "Requests that repeated one statement shape more than DB_N_PLUS_ONE_THRESHOLD times", ("route",))
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+def shape_id(shape: str) -> str:
+    """로그와 응답 헤더에서 쿼리 모양을 가리킬 짧은 id"""
+    return hashlib.sha1(shape.encode()).hexdigest()[:8]
+
+def _truncate(value: str) -> str:
+    return value if len(value) <= DB_DIAGNOSTICS_MAX_LENGTH else value[:DB_DIAGNOSTICS_MAX_LENGTH] + "..."
+
+def format_parameters(parameters, executemany: bool = False) -> str:
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+
+    if isinstance(parameters, dict):
+        return _truncate(repr({
+            key: "***" if SENSITIVE_PARAMETER.search(key) else value
+            for key, value in parameters.items()
+        }))
+
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(item).__name__ for item in parameters) + ")"
+
+    return f"<{type(parameters).__name__}>"
+
+def is_read_only(statement: str) -> bool:
+    """EXPLAIN ANALYZE 로 한 번 더 실행해도 되는 문장인지"""
+    return statement.lstrip()[:6].upper() == "SELECT" and not _SIDE_EFFECTS.search(statement)
+
+def _explain(conn, statement: str, parameters) -> str:
+    """
+    같은 커넥션에서 실행 계획을 조회합니다.
+
+    ANALYZE 는 쿼리를 실제로 한 번 더 실행하므로 is_read_only() 인 문장에만 쓰고,
+    실패해도 요청의 트랜잭션이 깨지지 않도록 savepoint 안에서 돌립니다.
+    """
+    explain = "EXPLAIN (ANALYZE, BUFFERS) " if is_read_only(statement) else "EXPLAIN "
+    cursor = conn.connection.cursor()
+
+    try:
+        cursor.execute("SAVEPOINT query_diagnostics_explain")
+
+        try:
+            cursor.execute(explain + statement, parameters)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT query_diagnostics_explain")
+            raise
+        finally:
+            cursor.execute("RELEASE SAVEPOINT query_diagnostics_explain")
+    finally:
+        cursor.close()
+
+    return plan
+
+def _on_slow_query(conn, statement: str, parameters, elapsed: float, executemany: bool):
+    slow_queries_total.inc()
+
+    stats = request_metrics.current()
+
+    if stats is not None:
+        stats.slow_queries += 1
+
+    message = (
+        f"Slow query ({elapsed * 1000:.1f}ms, shape={shape_id(statement_shape(statement))}): "
+        f"{_truncate(statement)} parameters={format_parameters(parameters, executemany)}"
+    )
+
+    if not executemany and DB_SLOW_QUERY_EXPLAIN_RATE > 0 and random.random() < DB_SLOW_QUERY_EXPLAIN_RATE:
+        try:
+            message += "\n" + _explain(conn, statement, parameters)
+            explains_total.inc(result="success")
+        except Exception as e:
+            explains_total.inc(result="error")
+            message += f"\nEXPLAIN failed: {e!r}"
+
+    logger.warning(message)
+
+def install(engine):
+    """엔진에 느린 쿼리 로그와 요청별 쿼리 모양 집계를 붙입니다. (비동기 엔진은 sync_engine 을 넘깁니다)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("diagnostics_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["diagnostics_started_at"].pop()
+
+        stats = request_metrics.current()
+
+        if stats is not None:
+            shape = statement_shape(statement)
+            stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+
+        if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+            _on_slow_query(conn, statement, parameters, elapsed, executemany)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        connection = context.connection
+
+        if connection is not None and connection.info.get("diagnostics_started_at"):
+            connection.info["diagnostics_started_at"].pop()
+
+    logger.info(f"Query diagnostics enabled on {engine.pool.logging_name or 'engine'}: slow>={DB_SLOW_QUERY_MS}ms, explain_rate={DB_SLOW_QUERY_EXPLAIN_RATE}, n+1>{DB_N_PLUS_ONE_THRESHOLD}")
+
+def repeated_shapes(stats: request_metrics.RequestStats) -> list:
+    """DB_N_PLUS_ONE_THRESHOLD 번 넘게 반복된 (모양, 횟수) 목록 (많은 것부터)"""
+    return sorted(
+        ((shape, count) for shape, count in stats.shapes.items() if count > DB_N_PLUS_ONE_THRESHOLD),
+        key=lambda item: item[1], reverse=True
+    )
+
+def header_value(stats: request_metrics.RequestStats) -> str:
+    repeated = ",".join(f"{shape_id(shape)}x{count}" for shape, count in repeated_shapes(stats))
+
+    return f"queries={stats.queries}; db_ms={stats.db_seconds * 1000:.1f}; slow={stats.slow_queries}; repeated={repeated or '-'}"
+
+class QueryDiagnosticsMiddleware:
+    """
+    요청이 끝나면 N+1 로 보이는 쿼리 모양을 로그로 남기고, DB_DIAGNOSTICS_HEADER 면 요약을 응답 헤더로 붙입니다.
+
+    RequestMetricsMiddleware 가 만든 RequestStats 를 쓰므로 그보다 안쪽에 둬야 합니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_header(message):
+            stats = request_metrics.current()
+
+            # 스트리밍 응답이면 헤더를 보내는 시점까지의 쿼리만 들어갑니다.
+            if message["type"] == "http.response.start" and stats is not None:
+                message["headers"] = [*message.get("headers", []), (HEADER_NAME, header_value(stats).encode("latin-1"))]
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header if DB_DIAGNOSTICS_HEADER else send)
+        finally:
+            stats = request_metrics.current()
+            repeated = repeated_shapes(stats) if stats is not None else []
+
+            if repeated:
+                route = request_metrics.route_label(scope)
+                n_plus_one_total.inc(route=route)
+
+                for shape, count in repeated:
+                    logger.warning(f"Possible N+1 in {scope['method']} {route}: {count} queries with shape={shape_id(shape)}: {_truncate(shape)}")
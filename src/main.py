@@ -1,19 +1,67 @@
+import time
+
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, Depends, Header, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import select
 
+from contextlib import asynccontextmanager
+
+import asyncio
+
 # 라우터들
 from src.controllers.login import login_controller
 from src.controllers.application import applicaction_controller
 from src.controllers.verify import verify_controller
 from src.controllers.lookup import lookup_controller
+from src.controllers.internal import internal_controller
+
+from src.database import database, query_diagnostics
+from src.utils import autocomplete, http_client, mailer, password_hasher, recent_search, startup, request_metrics
+
+# 기동할 때 함께 조회해 캐시해 두는 시크릿 (DB 외에는 실패해도 처음 쓸 때 다시 조회합니다)
+STARTUP_OPTIONAL_SECRETS = (
+    mailer.MAIL_SENDER_SECRET,
+    'candleHelper/authToken/searchAddress',
+    'candleHelper/authToken/searchAddressToPoint',
+)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup.phase("secrets"):
+        secrets = await startup.prefetch_secrets((database.DB_SECRET_NAME,), STARTUP_OPTIONAL_SECRETS)
+
+    with startup.phase("database"):
+        database.init_engines(secrets[database.DB_SECRET_NAME])
+
+    with startup.phase("background"):
+        # 인덱스가 만들어지기 전까지 /search/keywords 는 DB 로 조회합니다.
+        autocomplete.index.rebuild_in_background()
+        mailer.mailer.start()
+        password_hasher.start()
+        recent_search.buffer.start()
+
+    startup.report()
+
+    yield
+
+    await http_client.close_client()
+    # 큐에 남은 메일을 잠시 더 보내고 종료합니다. (기다리는 동안 이벤트 루프를 막지 않도록 스레드에서)
+    await asyncio.to_thread(mailer.mailer.stop)
+    password_hasher.shutdown()
+    # 버퍼에 남은 최근 검색어를 반영한 뒤 엔진을 닫습니다.
+    await asyncio.to_thread(recent_search.buffer.stop)
+    await database.dispose_engines()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(login_controller.router)
 app.include_router(verify_controller.router)
 app.include_router(applicaction_controller.router)
 app.include_router(lookup_controller.router)
+app.include_router(internal_controller.router)
+app.include_router(internal_controller.metrics_router)
 
 origins = ['*']
 
@@ -25,4 +73,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 쿼리 진단 모드면 요청별 N+1 경고와 (DB_DIAGNOSTICS_HEADER) 요약 헤더를 붙입니다. RequestStats 를 쓰므로 메트릭 미들웨어 안쪽에 둡니다.
+if query_diagnostics.DB_DIAGNOSTICS:
+    app.add_middleware(query_diagnostics.QueryDiagnosticsMiddleware)
+
+# 가장 바깥에서 라우트별 지연 시간과 요청별 DB 쿼리 수 / 시간을 잽니다. (/metrics)
+app.add_middleware(request_metrics.RequestMetricsMiddleware)
 
+startup.record("import", time.perf_counter() - _import_started)
@@ -0,0 +1,263 @@
+from sqlalchemy import select
+
+from collections import defaultdict
+
+import os
+import threading
+import time
+import logging
+
+from src.database import database
+
+# 나눔 이름 자동완성용 메모리 인덱스
+# 접두/중간 일치와 초성 검색("ㄴㄴ" -> "나눔")을 지원합니다.
+# 워커마다 따로 갖는 인덱스이므로 다른 워커의 수정은 AUTOCOMPLETE_REFRESH_SECONDS 마다 다시 읽어 반영합니다.
+AUTOCOMPLETE_REFRESH_SECONDS = float(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS') or 300)
+
+logger = logging.getLogger(__name__)
+
+CHOSEONG = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+CHOSEONG_SET = frozenset(CHOSEONG)
+
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+JUNGSEONG_COUNT = 21
+JONGSEONG_COUNT = 28
+
+def _is_syllable(char: str) -> bool:
+    return HANGUL_BASE <= ord(char) <= HANGUL_LAST
+
+def get_choseong(char: str) -> str:
+    """한글 음절이면 초성을, 아니면 글자 그대로를 반환합니다."""
+    if _is_syllable(char):
+        return CHOSEONG[(ord(char) - HANGUL_BASE) // (JUNGSEONG_COUNT * JONGSEONG_COUNT)]
+
+    return char
+
+def _has_jongseong(char: str) -> bool:
+    return _is_syllable(char) and (ord(char) - HANGUL_BASE) % JONGSEONG_COUNT != 0
+
+def _without_jongseong(char: str) -> str:
+    if not _is_syllable(char):
+        return char
+
+    return chr(ord(char) - (ord(char) - HANGUL_BASE) % JONGSEONG_COUNT)
+
+def _char_matches(query_char: str, name_char: str, is_last: bool) -> bool:
+    if query_char == name_char:
+        return True
+
+    # 초성만 입력한 경우
+    if query_char in CHOSEONG_SET:
+        return get_choseong(name_char) == query_char
+
+    # 입력 중인 마지막 글자는 받침이 아직 없을 수 있습니다. ("나누" -> "나눔")
+    if is_last and _is_syllable(query_char) and not _has_jongseong(query_char):
+        return _without_jongseong(name_char) == query_char
+
+    return False
+
+class ShareEntry:
+    __slots__ = ('id', 'name', 'folded', 'doro_address', 'jibun_address', 'point_lat', 'point_lng')
+
+    def __init__(self, id, name, doro_address, jibun_address, point_lat, point_lng):
+        self.id = id
+        self.name = name or ""
+        self.folded = self.name.lower()
+        self.doro_address = doro_address
+        self.jibun_address = jibun_address
+        self.point_lat = point_lat
+        self.point_lng = point_lng
+
+    def keys(self) -> set:
+        """역색인에 넣을 글자들 (원래 글자 + 초성)"""
+        return set(self.folded) | {get_choseong(char) for char in self.folded}
+
+    def match_position(self, query: str) -> int:
+        """이름 안에서 query 가 일치하는 첫 위치. 없으면 -1."""
+        last = len(query) - 1
+
+        for start in range(len(self.folded) - len(query) + 1):
+            if all(_char_matches(query_char, self.folded[start + i], i == last) for i, query_char in enumerate(query)):
+                return start
+
+        return -1
+
+    def as_row(self) -> tuple:
+        return (self.id, self.name, self.doro_address, self.jibun_address, self.point_lat, self.point_lng)
+
+class AutocompleteIndex:
+    def __init__(self):
+        self.ready = False
+        self.loaded_at = None
+        self._entries = {}
+        self._postings = defaultdict(set)
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        # 다시 만드는 동안 들어온 변경 (새 인덱스로 바꾸기 전에 그대로 다시 적용합니다)
+        self._journal = None
+
+    def _add(self, entry: ShareEntry):
+        self._entries[entry.id] = entry
+
+        for key in entry.keys():
+            self._postings[key].add(entry.id)
+
+    def _discard(self, id: int):
+        entry = self._entries.pop(id, None)
+
+        if entry is None:
+            return
+
+        for key in entry.keys():
+            ids = self._postings.get(key)
+
+            if ids is not None:
+                ids.discard(id)
+
+                if not ids:
+                    del self._postings[key]
+
+    def _upsert(self, id: int, name: str, doro_address: str, jibun_address: str, point_lat: float, point_lng: float):
+        self._discard(id)
+        self._add(ShareEntry(id, name, doro_address, jibun_address, point_lat, point_lng))
+
+    def _update(self, id: int, fields: dict):
+        entry = self._entries.get(id)
+
+        if entry is None:
+            return
+
+        values = {name: getattr(entry, name) for name in ('name', 'doro_address', 'jibun_address', 'point_lat', 'point_lng')}
+        values.update(fields)
+
+        self._discard(id)
+        self._add(ShareEntry(id, **values))
+
+    def _remove(self, ids: tuple):
+        for id in ids:
+            self._discard(id)
+
+    def _apply(self, operation: str, *args):
+        """잠근 상태에서 호출합니다. 다시 만드는 중이면 변경을 기록해 둡니다."""
+        getattr(self, operation)(*args)
+
+        if self._journal is not None:
+            self._journal.append((operation, args))
+
+    def rebuild(self):
+        """삭제되지 않은 나눔 전체로 인덱스를 다시 만듭니다."""
+        try:
+            # 조회 전에 기록을 시작해야 조회와 교체 사이에 들어온 변경이 빠지지 않습니다. (다시 적용해도 결과는 같습니다)
+            with self._lock:
+                self._journal = []
+
+            stmt = select(
+                database.ShareInfo.id, database.ShareInfo.name, database.ShareInfo.doro_address,
+                database.ShareInfo.jibun_address, database.ShareInfo.point_lat, database.ShareInfo.point_lng
+            ).where(database.ShareInfo.is_deleted == False)
+
+            db = database.session()
+
+            try:
+                rows = db.execute(stmt).all()
+            finally:
+                db.close()
+
+            fresh = AutocompleteIndex()
+
+            for row in rows:
+                fresh._add(ShareEntry(*row))
+
+            with self._lock:
+                for operation, args in self._journal:
+                    getattr(fresh, operation)(*args)
+
+                self._entries = fresh._entries
+                self._postings = fresh._postings
+                self.loaded_at = time.monotonic()
+                self.ready = True
+
+            logger.info(f"Autocomplete index built with {len(rows)} shares")
+        except Exception:
+            logger.exception("Failed to build autocomplete index")
+        finally:
+            with self._lock:
+                self._journal = None
+                self._rebuilding = False
+
+    def rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+
+            self._rebuilding = True
+
+        threading.Thread(target=self.rebuild, daemon=True).start()
+
+    def upsert(self, id: int, name: str, doro_address: str, jibun_address: str, point_lat: float, point_lng: float):
+        with self._lock:
+            self._apply('_upsert', id, name, doro_address, jibun_address, point_lat, point_lng)
+
+    def update(self, id: int, **fields):
+        """name / doro_address / jibun_address / point_lat / point_lng 중 바뀐 값만 반영합니다."""
+        with self._lock:
+            self._apply('_update', id, fields)
+
+    def remove(self, *ids: int):
+        with self._lock:
+            self._apply('_remove', ids)
+
+    def search(self, keyword: str, bounds: tuple = None, limit: int = 20) -> list:
+        """
+        keyword 가 이름에 포함된 나눔을 반환합니다. 접두 일치가 먼저 옵니다.
+
+        bounds 는 (southwest_lng, southwest_lat, northeast_lng, northeast_lat) 입니다.
+        """
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at > AUTOCOMPLETE_REFRESH_SECONDS:
+            self.rebuild_in_background()
+
+        query = keyword.strip().lower()
+
+        if not query:
+            return []
+
+        last = len(query) - 1
+
+        with self._lock:
+            candidates = None
+
+            for i, char in enumerate(query):
+                if i == last and _is_syllable(char) and not _has_jongseong(char):
+                    # 받침 없이 입력 중인 글자는 초성으로만 후보를 좁힙니다.
+                    key = get_choseong(char)
+                else:
+                    key = char
+
+                ids = self._postings.get(key, set())
+                candidates = set(ids) if candidates is None else candidates & ids
+
+                if not candidates:
+                    return []
+
+            matches = []
+
+            for id in candidates:
+                entry = self._entries[id]
+
+                if bounds is not None and not (
+                    entry.point_lat is not None and entry.point_lng is not None
+                    and bounds[0] <= entry.point_lng <= bounds[2] and bounds[1] <= entry.point_lat <= bounds[3]
+                ):
+                    continue
+
+                position = entry.match_position(query)
+
+                if position >= 0:
+                    matches.append((position, len(entry.name), entry.id, entry))
+
+        matches.sort(key=lambda match: match[:3])
+
+        return [entry for _, _, _, entry in matches[:limit]]
+
+index = AutocompleteIndex()
@@ -0,0 +1,24 @@
+from fastapi import Response, status
+
+import hashlib
+
+# ETag / If-None-Match 처리
+
+def make_etag(*parts) -> str:
+    """parts 로 강한(strong) ETag 를 만듭니다."""
+    return '"' + hashlib.md5(":".join(map(str, parts)).encode()).hexdigest() + '"'
+
+def matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+
+    return False
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
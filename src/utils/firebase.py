@@ -0,0 +1,41 @@
+import json
+import os
+import threading
+
+# Firebase Admin 은 소셜 회원 탈퇴에서만 쓰므로 처음 쓸 때 import 하고 초기화합니다.
+# (firebase_admin import 와 인증서 로드가 기동 시간을 늘리지 않도록)
+_app = None
+_lock = threading.Lock()
+
+def _load_certificate() -> dict:
+    value = os.getenv("NANUMSA_SERVER_FIREBASE_ADMIN_CREDENTIAL_FILE_PATH")
+
+    # 환경변수에 JSON 을 직접 넣거나 파일 경로를 넣을 수 있습니다.
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        with open(value) as f:
+            return json.load(f)
+
+def get_app():
+    global _app
+
+    if _app is not None:
+        return _app
+
+    with _lock:
+        if _app is None:
+            import firebase_admin
+            from firebase_admin import credentials
+
+            _app = firebase_admin.initialize_app(credentials.Certificate(_load_certificate()))
+
+    return _app
+
+def get_auth():
+    """초기화된 firebase_admin.auth 모듈을 반환합니다."""
+    get_app()
+
+    from firebase_admin import auth
+
+    return auth
@@ -0,0 +1,137 @@
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
+
+from datetime import timedelta
+
+import os
+import logging
+
+from src.database import database
+from src.utils import metrics
+from src.utils.lru_cache import TTLCache
+
+# 지번 주소 -> 좌표 캐시
+# 프로세스 LRU -> geocode_cache 테이블 -> 카카오 API 순으로 찾습니다.
+# 테이블 값이 GEOCODE_CACHE_TTL_DAYS 보다 오래되면 다시 조회하고, 조회에 실패하면 오래된 값을 그대로 씁니다.
+GEOCODE_MEMORY_CACHE_SIZE = int(os.getenv('GEOCODE_MEMORY_CACHE_SIZE') or 5000)
+GEOCODE_MEMORY_CACHE_TTL = float(os.getenv('GEOCODE_MEMORY_CACHE_TTL') or 3600)
+GEOCODE_CACHE_TTL_DAYS = float(os.getenv('GEOCODE_CACHE_TTL_DAYS') or 90)
+
+logger = logging.getLogger(__name__)
+
+memory_cache = TTLCache(GEOCODE_MEMORY_CACHE_SIZE, GEOCODE_MEMORY_CACHE_TTL)
+
+lookups = metrics.counter(
+    "geocode_cache_lookups_total",
+    "Geocode lookups by the layer that answered them (memory, db, stale, api, failed)",
+    ("source",)
+)
+refreshes = metrics.counter("geocode_cache_refreshes_total", "Expired geocode_cache rows re-geocoded through the API")
+
+def normalize_address(address: str) -> str:
+    return " ".join((address or "").split())
+
+async def _load_rows(db: AsyncSession, addresses: list) -> dict:
+    """address -> (lat, lng, is_fresh)"""
+    is_fresh = database.GeocodeCache.updated_at >= func.now() - timedelta(days=GEOCODE_CACHE_TTL_DAYS)
+
+    stmt = select(
+        database.GeocodeCache.address, database.GeocodeCache.lat, database.GeocodeCache.lng, is_fresh.label('is_fresh')
+    ).where(database.GeocodeCache.address.in_(addresses))
+    matched_rows = await db.execute(stmt)
+
+    return {row.address: (row.lat, row.lng, row.is_fresh) for row in matched_rows.all()}
+
+async def _store_rows(db: AsyncSession, points: dict):
+    stmt = insert(database.GeocodeCache).values([
+        {"address": address, "lat": lat, "lng": lng, "updated_at": func.now()}
+        for address, (lat, lng) in points.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[database.GeocodeCache.address],
+        set_={"lat": stmt.excluded.lat, "lng": stmt.excluded.lng, "updated_at": func.now()}
+    )
+
+    await db.execute(stmt)
+    await db.commit()
+
+async def geocode_many(db: AsyncSession, addresses: list, fetch) -> dict:
+    """
+    주소 목록의 좌표를 캐시를 거쳐 구합니다. {원래 주소: (lat, lng)} 를 반환하며 못 구한 주소는 빠집니다.
+
+    fetch 는 주소 목록을 받아 같은 순서로 (lat, lng) 또는 None 목록을 돌려주는 코루틴 함수입니다.
+    새로 구한 좌표는 한 번의 upsert 로 테이블에 저장합니다.
+    """
+    keys = {address: normalize_address(address) for address in addresses}
+    found = {}
+
+    pending = []
+
+    for key in dict.fromkeys(keys.values()):
+        point = memory_cache.get(key)
+
+        if point is None:
+            pending.append(key)
+        else:
+            found[key] = point
+            lookups.inc(source="memory")
+
+    stale = {}
+
+    if pending:
+        rows = await _load_rows(db, pending)
+        missing = []
+
+        for key in pending:
+            row = rows.get(key)
+
+            if row is not None and row[2]:
+                found[key] = (row[0], row[1])
+                memory_cache.set(key, found[key])
+                lookups.inc(source="db")
+            else:
+                if row is not None:
+                    stale[key] = (row[0], row[1])
+                    refreshes.inc()
+
+                missing.append(key)
+
+        if missing:
+            fetched = {}
+
+            for key, point in zip(missing, await fetch(missing)):
+                if point is not None:
+                    fetched[key] = point
+                    lookups.inc(source="api")
+                elif key in stale:
+                    found[key] = stale[key]
+                    memory_cache.set(key, stale[key])
+                    lookups.inc(source="stale")
+                else:
+                    lookups.inc(source="failed")
+
+            if fetched:
+                found.update(fetched)
+
+                for key, point in fetched.items():
+                    memory_cache.set(key, point)
+
+                try:
+                    await _store_rows(db, fetched)
+                except Exception:
+                    # 저장에 실패해도 응답은 그대로 돌려줍니다.
+                    logger.exception("Failed to store geocode cache rows")
+                    await db.rollback()
+
+    return {address: found[key] for address, key in keys.items() if key in found}
+
+def hit_ratio() -> dict:
+    counts = {source: lookups.get(source=source) for source in ("memory", "db", "stale", "api", "failed")}
+    total = sum(counts.values())
+
+    return {
+        "lookups": counts,
+        "hit_ratio": (counts["memory"] + counts["db"] + counts["stale"]) / total if total else None,
+        "memory": memory_cache.stats(),
+    }
@@ -0,0 +1,39 @@
+import httpx
+
+import os
+import logging
+
+# 외부 API 호출용 공용 비동기 HTTP 클라이언트
+# 앱이 떠 있는 동안 하나의 연결 풀을 재사용합니다. (HTTP/2 지원 시 연결 하나로 여러 요청을 보냅니다.)
+HTTP_CLIENT_TIMEOUT = float(os.getenv('HTTP_CLIENT_TIMEOUT') or 5)
+HTTP_CLIENT_MAX_CONNECTIONS = int(os.getenv('HTTP_CLIENT_MAX_CONNECTIONS') or 50)
+HTTP_CLIENT_MAX_KEEPALIVE = int(os.getenv('HTTP_CLIENT_MAX_KEEPALIVE') or 20)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client = None
+
+def get_client() -> httpx.AsyncClient:
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=HTTP_CLIENT_TIMEOUT,
+            limits=httpx.Limits(max_connections=HTTP_CLIENT_MAX_CONNECTIONS, max_keepalive_connections=HTTP_CLIENT_MAX_KEEPALIVE),
+        )
+
+    return _client
+
+async def close_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,254 @@
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from typing import NamedTuple
+
+import heapq
+import itertools
+import logging
+import os
+import queue
+import smtplib
+import ssl
+import threading
+import time
+
+from src.aws.secretManager import get_secret, invalidate_secret
+from src.utils import metrics
+from src.utils.str_to_bool import str_to_bool
+
+# 메일 발송 큐
+# 요청 스레드는 큐에 넣고 바로 돌아가며, 백그라운드 워커 하나가 로그인된 SMTP 연결을 유지하면서 보냅니다.
+# 실패한 메일은 지수 백오프로 다시 보내고, 초당 MAIL_RATE_PER_SECOND 통을 넘지 않게 보냅니다.
+# 프로세스 안의 큐이므로 프로세스가 죽으면 아직 보내지 못한 메일은 사라집니다.
+#
+# 로컬에서는 디버그 SMTP 서버로 대신할 수 있습니다. (aiosmtpd 는 dev 의존성이고, tests/test_mailer.py 도 같은 서버로 테스트합니다)
+#   python -m aiosmtpd -n -l localhost:1025
+#   SMTP_HOST=localhost SMTP_PORT=1025 SMTP_SSL=false SMTP_AUTH=false
+SMTP_HOST = os.getenv('SMTP_HOST') or 'smtp.naver.com'
+SMTP_PORT = int(os.getenv('SMTP_PORT') or 465)
+SMTP_SSL = str_to_bool(os.getenv('SMTP_SSL') or 'true')
+SMTP_STARTTLS = str_to_bool(os.getenv('SMTP_STARTTLS') or 'false')
+SMTP_AUTH = str_to_bool(os.getenv('SMTP_AUTH') or 'true')
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT') or 10)
+MAIL_SENDER_SECRET = os.getenv('MAIL_SENDER_SECRET') or 'candleHelper/Account/VerifyEmailSender'
+
+MAIL_QUEUE_SIZE = int(os.getenv('MAIL_QUEUE_SIZE') or 1000)
+MAIL_BATCH_SIZE = int(os.getenv('MAIL_BATCH_SIZE') or 20)
+MAIL_RATE_PER_SECOND = float(os.getenv('MAIL_RATE_PER_SECOND') or 5)
+MAIL_MAX_ATTEMPTS = int(os.getenv('MAIL_MAX_ATTEMPTS') or 5)
+MAIL_RETRY_BASE_DELAY = float(os.getenv('MAIL_RETRY_BASE_DELAY') or 2)
+# 이 시간 동안 보낼 메일이 없으면 연결을 닫습니다. (서버가 먼저 끊기 전에)
+MAIL_IDLE_TIMEOUT = float(os.getenv('MAIL_IDLE_TIMEOUT') or 30)
+
+logger = logging.getLogger(__name__)
+
+sent_total = metrics.counter("mail_sent_total", "Emails delivered to the SMTP server")
+failed_total = metrics.counter("mail_failed_total", "Emails dropped after exhausting retries")
+retries_total = metrics.counter("mail_retries_total", "Email delivery retries")
+connects_total = metrics.counter("mail_smtp_connects_total", "SMTP connections opened (including logins)")
+queue_depth = metrics.gauge("mail_queue_depth", "Emails waiting in the outbound queue (including scheduled retries)")
+
+# stop() 이 큐에 넣어 기다리고 있는 워커를 바로 깨웁니다.
+_STOP = object()
+
+class OutgoingMail(NamedTuple):
+    to: str
+    subject: str
+    html: str
+    attempts: int = 0
+
+class Mailer:
+    def __init__(self):
+        self._queue = queue.Queue(MAIL_QUEUE_SIZE)
+        self._retries = []
+        self._retry_seq = itertools.count()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = None
+        self._sender = None
+        self._last_used = 0.0
+        self._next_send_at = 0.0
+
+        queue_depth.set_function(lambda: self._queue.qsize() + len(self._retries))
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="mailer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """
+        큐에 남은 메일을 timeout 동안 보내고 워커를 멈춥니다.
+
+        SMTP 연결은 워커 스레드만 쓰고 닫습니다. 블로킹 호출이므로 async 코드에서는 asyncio.to_thread 로 부릅니다.
+        """
+        self._stopping.set()
+
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            # 큐가 가득 차 있으면 워커가 기다리지 않고 계속 꺼내므로 깨울 필요가 없습니다.
+            pass
+
+        thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+
+            if thread.is_alive():
+                logger.warning(f"Mailer did not stop within {timeout}s, {self._queue.qsize() + len(self._retries)} mails left")
+
+    def send(self, to: str, subject: str, html: str) -> bool:
+        """메일을 큐에 넣습니다. 큐가 가득 차면 False."""
+        self.start()
+
+        try:
+            self._queue.put_nowait(OutgoingMail(to, subject, html))
+        except queue.Full:
+            logger.error(f"Mail queue is full, dropping mail to {to}")
+            failed_total.inc()
+            return False
+
+        return True
+
+    def _run(self):
+        try:
+            while not (self._stopping.is_set() and self._queue.empty() and not self._retries):
+                batch = self._next_batch()
+
+                if not batch:
+                    if self._server is not None and time.monotonic() - self._last_used > MAIL_IDLE_TIMEOUT:
+                        self._close()
+
+                    continue
+
+                for mail in batch:
+                    self._deliver(mail)
+        finally:
+            self._close()
+
+    def _next_batch(self) -> list:
+        """보낼 때가 된 재시도 메일과 큐의 메일을 MAIL_BATCH_SIZE 개까지 꺼냅니다."""
+        batch = []
+        now = time.monotonic()
+
+        while self._retries and self._retries[0][0] <= now and len(batch) < MAIL_BATCH_SIZE:
+            batch.append(heapq.heappop(self._retries)[2])
+
+        wait = 0 if batch else 1.0
+
+        if not batch and self._retries:
+            wait = min(wait, max(0.0, self._retries[0][0] - now))
+
+        while len(batch) < MAIL_BATCH_SIZE:
+            try:
+                mail = self._queue.get(timeout=wait) if wait else self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+            wait = 0
+
+            if mail is not _STOP:
+                batch.append(mail)
+
+        return batch
+
+    def _deliver(self, mail: OutgoingMail):
+        self._throttle()
+
+        try:
+            server = self._connect()
+            server.send_message(self._build_message(mail))
+            self._last_used = time.monotonic()
+            sent_total.inc()
+        except (smtplib.SMTPException, OSError) as e:
+            # 연결이 끊겼을 수도 있으니 다음에는 새로 연결합니다.
+            self._close()
+
+            if isinstance(e, smtplib.SMTPAuthenticationError):
+                # 비밀번호가 바뀌었을 수 있으므로 다음 연결 때 시크릿을 다시 조회합니다.
+                invalidate_secret(MAIL_SENDER_SECRET)
+
+            self._retry(mail, e)
+
+    def _retry(self, mail: OutgoingMail, error: Exception):
+        attempts = mail.attempts + 1
+
+        if attempts >= MAIL_MAX_ATTEMPTS or isinstance(error, smtplib.SMTPRecipientsRefused):
+            logger.error(f"Giving up mail to {mail.to} after {attempts} attempts: {error!r}")
+            failed_total.inc()
+            return
+
+        delay = MAIL_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+        logger.warning(f"Mail to {mail.to} failed ({error!r}), retrying in {delay:.1f}s")
+        retries_total.inc()
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._retry_seq), mail._replace(attempts=attempts)))
+
+    def _throttle(self):
+        now = time.monotonic()
+
+        if self._next_send_at > now:
+            time.sleep(self._next_send_at - now)
+
+        self._next_send_at = max(now, self._next_send_at) + 1 / MAIL_RATE_PER_SECOND
+
+    def _connect(self) -> smtplib.SMTP:
+        if self._server is not None:
+            return self._server
+
+        self._sender = get_secret(MAIL_SENDER_SECRET)
+
+        if SMTP_SSL:
+            server = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT, context=ssl.create_default_context())
+        else:
+            server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+
+        try:
+            server.ehlo()
+
+            if SMTP_STARTTLS:
+                server.starttls(context=ssl.create_default_context())
+                server.ehlo()
+
+            if SMTP_AUTH:
+                server.login(self._sender['id'], self._sender['password'])
+        except Exception:
+            server.close()
+            raise
+
+        connects_total.inc()
+        self._server = server
+        self._last_used = time.monotonic()
+
+        return server
+
+    def _close(self):
+        server, self._server = self._server, None
+
+        if server is None:
+            return
+
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _build_message(self, mail: OutgoingMail) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self._sender['email']
+        msg['To'] = mail.to
+        msg['Subject'] = mail.subject
+        msg.attach(MIMEText(mail.html, 'html'))
+
+        return msg
+
+mailer = Mailer()
+
+def send_mail(to: str, subject: str, html: str) -> bool:
+    return mailer.send(to, subject, html)
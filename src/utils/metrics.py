@@ -0,0 +1,190 @@
+import threading
+import bisect
+
+# 프로세스 내부 메트릭 저장소 (카운터 / 게이지 / 히스토그램)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def _label_key(labelnames, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labelnames, key: tuple, extra: dict = None) -> str:
+    pairs = list(zip(labelnames, key))
+
+    if extra:
+        pairs.extend(extra.items())
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in self._values.items()]
+
+    def snapshot(self):
+        with self._lock:
+            return {",".join(key) or "": value for key, value in self._values.items()}
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._functions = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(self.labelnames, labels)] = value
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, function, **labels):
+        """조회 시점에 function() 의 결과를 값으로 사용합니다."""
+        with self._lock:
+            self._functions[_label_key(self.labelnames, labels)] = function
+
+    def _collect_functions(self):
+        with self._lock:
+            functions = list(self._functions.items())
+
+        for key, function in functions:
+            try:
+                value = function()
+            except Exception:
+                continue
+
+            with self._lock:
+                self._values[key] = value
+
+    def samples(self):
+        self._collect_functions()
+        return super().samples()
+
+    def snapshot(self):
+        self._collect_functions()
+        return super().snapshot()
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            state = self._values.get(key)
+
+            if state is None:
+                state = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._values[key] = state
+
+            state["counts"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self):
+        result = []
+
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+
+                for bound, count in zip(self.buckets, state["counts"]):
+                    cumulative += count
+                    result.append((self.name + "_bucket", key, {"le": repr(float(bound))}, cumulative))
+
+                result.append((self.name + "_bucket", key, {"le": "+Inf"}, state["count"]))
+                result.append((self.name + "_sum", key, None, state["sum"]))
+                result.append((self.name + "_count", key, None, state["count"]))
+
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                ",".join(key) or "": {
+                    "count": state["count"],
+                    "sum": state["sum"],
+                    "buckets": dict(zip([*map(str, self.buckets), "+Inf"], state["counts"])),
+                }
+                for key, state in self._values.items()
+            }
+
+def _register(metric_class, name: str, documentation: str, labelnames=(), **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+
+        if metric is None:
+            metric = metric_class(name, documentation, labelnames, **kwargs)
+            _registry[name] = metric
+
+        return metric
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return _register(Counter, name, documentation, labelnames)
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return _register(Gauge, name, documentation, labelnames)
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+def snapshot(prefix: str = "") -> dict:
+    """등록된 메트릭을 JSON 으로 내보낼 수 있는 dict 로 반환합니다."""
+    with _registry_lock:
+        metrics = [metric for name, metric in _registry.items() if name.startswith(prefix)]
+
+    return {metric.name: metric.snapshot() for metric in metrics}
+
+def render_prometheus() -> str:
+    """등록된 메트릭을 Prometheus text exposition 형식으로 반환합니다."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+
+    lines = []
+
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+
+        for sample_name, key, extra, value in metric.samples():
+            lines.append(f"{sample_name}{_format_labels(metric.labelnames, key, extra)} {float(value)}")
+
+    return "\n".join(lines) + "\n"
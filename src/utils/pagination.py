@@ -0,0 +1,34 @@
+import base64
+import json
+
+# keyset 페이지네이션 커서
+# 마지막 row 의 정렬 키 값들을 base64 로 감싼 문자열입니다. (클라이언트는 그대로 돌려보내기만 합니다)
+
+def encode_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, types: tuple) -> tuple:
+    """
+    커서를 풀어 types 순서대로 확인한 값들을 반환합니다. 잘못된 커서면 ValueError
+
+    float 자리에는 JSON 정수도 받습니다. (bool 은 받지 않습니다)
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("invalid cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("invalid cursor")
+
+    decoded = []
+
+    for value, expected in zip(values, types):
+        accepted = (int, float) if expected is float else expected
+
+        if isinstance(value, bool) or not isinstance(value, accepted):
+            raise ValueError("invalid cursor")
+
+        decoded.append(expected(value))
+
+    return tuple(decoded)
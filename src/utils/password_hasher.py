@@ -0,0 +1,127 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.hash import sha256_crypt
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+
+from src.utils import metrics
+
+# 비밀번호 해시 (sha256_crypt, 535000 라운드)
+# 해시 한 번에 CPU 를 수백 ms 씁니다. 스레드풀에서 돌리면 GIL 을 잡고 있어 다른 요청까지 멈추므로 별도 프로세스 풀에서 계산합니다.
+# 동시에 풀로 보내는 작업은 PASSWORD_HASH_MAX_CONCURRENCY 개로 제한하고, 나머지는 이벤트 루프에서 순서를 기다립니다.
+# 풀은 uvicorn/gunicorn 워커(WEB_CONCURRENCY)마다 따로 생기므로, 기본값은 코어 수를 워커 수로 나눈 값입니다.
+# (워커 N 개가 각자 코어 수만큼 프로세스를 띄워 CPU 를 N 배로 나눠 쓰지 않도록)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY') or 1)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS') or max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+PASSWORD_HASH_MAX_CONCURRENCY = int(os.getenv('PASSWORD_HASH_MAX_CONCURRENCY') or PASSWORD_HASH_WORKERS * 2)
+
+# 기존 비밀번호와 같은 값이 나오도록 salt 를 고정합니다.
+PASSWORD_SALT = 'fix'
+
+logger = logging.getLogger(__name__)
+
+waiting_gauge = metrics.gauge("password_hash_waiting", "Password hashes waiting for a free process pool slot")
+running_gauge = metrics.gauge("password_hash_running", "Password hashes submitted to the process pool")
+duration_histogram = metrics.histogram(
+    "password_hash_duration_seconds",
+    "Password hash latency including time spent waiting for the pool",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+def hash_password_sync(password: str) -> str:
+    return sha256_crypt.using(salt=PASSWORD_SALT).hash(password)
+
+def _warm_up() -> bool:
+    return True
+
+_executor = None
+_executor_lock = threading.Lock()
+_semaphore = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+
+    if _executor is not None:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None:
+            # 스레드(메일 워커, 시크릿 갱신 등)가 떠 있는 프로세스를 fork 하지 않도록 spawn 으로 띄웁니다.
+            _executor = ProcessPoolExecutor(PASSWORD_HASH_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+
+    return _executor
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(PASSWORD_HASH_MAX_CONCURRENCY)
+
+    return _semaphore
+
+def _reset_executor(broken: ProcessPoolExecutor):
+    global _executor
+
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+
+    broken.shutdown(wait=False, cancel_futures=True)
+
+def start():
+    """풀을 만들고 워커 프로세스를 미리 띄워 첫 로그인이 프로세스 시작을 기다리지 않게 합니다."""
+    if PASSWORD_HASH_WORKERS * WEB_CONCURRENCY > (os.cpu_count() or 1):
+        logger.warning(
+            f"Password hash pools oversubscribe the CPU: {WEB_CONCURRENCY} workers x {PASSWORD_HASH_WORKERS} processes "
+            f"> {os.cpu_count()} cores"
+        )
+
+    executor = _get_executor()
+
+    for _ in range(PASSWORD_HASH_WORKERS):
+        executor.submit(_warm_up)
+
+def shutdown():
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def hash_password(password: str) -> str:
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    semaphore = _get_semaphore()
+
+    waiting_gauge.inc()
+
+    try:
+        await semaphore.acquire()
+    finally:
+        waiting_gauge.dec()
+
+    running_gauge.inc()
+
+    try:
+        executor = _get_executor()
+
+        try:
+            return await loop.run_in_executor(executor, hash_password_sync, password)
+        except BrokenProcessPool:
+            # 워커가 죽었으면 풀을 새로 만들어 한 번 더 시도합니다.
+            logger.warning("Password hash pool is broken, restarting it")
+            _reset_executor(executor)
+
+            return await loop.run_in_executor(_get_executor(), hash_password_sync, password)
+    finally:
+        running_gauge.dec()
+        semaphore.release()
+        duration_histogram.observe(time.perf_counter() - started)
@@ -0,0 +1,241 @@
+from sqlalchemy import select, delete, func, any_, literal, Integer
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert, ARRAY
+
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import logging
+import os
+import threading
+import time
+
+from src.database import database
+from src.utils import metrics
+
+# 최근 검색어 (유저당 최근 RECENT_SEARCH_LIMIT 개)
+# 검색할 때마다 DB 에 쓰지 않고 버퍼에 모았다가 RECENT_SEARCH_FLUSH_INTERVAL 마다
+# INSERT ... ON CONFLICT (user_id, keyword) DO UPDATE 한 번과 개수 제한 DELETE 한 번으로 반영합니다.
+# 조회할 때는 DB 의 최근 목록에 아직 반영되지 않은 버퍼 내용을 앞에 합쳐서 돌려줍니다.
+# 프로세스 안의 버퍼이므로 프로세스가 죽으면 마지막 flush 이후의 검색어는 사라집니다.
+RECENT_SEARCH_LIMIT = int(os.getenv('RECENT_SEARCH_LIMIT') or 20)
+RECENT_SEARCH_FLUSH_INTERVAL = float(os.getenv('RECENT_SEARCH_FLUSH_INTERVAL') or 1)
+# 버퍼가 이만큼 차면 주기를 기다리지 않고 바로 flush 합니다.
+RECENT_SEARCH_BUFFER_SIZE = int(os.getenv('RECENT_SEARCH_BUFFER_SIZE') or 1000)
+# id 는 시퀀스에서 이만큼씩 미리 받아 두고 버퍼에 넣을 때 붙입니다. (응답의 id 로 바로 삭제할 수 있도록)
+RECENT_SEARCH_ID_BLOCK = int(os.getenv('RECENT_SEARCH_ID_BLOCK') or 100)
+
+logger = logging.getLogger(__name__)
+
+buffered_gauge = metrics.gauge("recent_search_buffered", "Recent search keywords waiting to be flushed")
+flushes_total = metrics.counter("recent_search_flushes_total", "Recent search buffer flushes", ("result",))
+flushed_rows_total = metrics.counter("recent_search_flushed_rows_total", "Recent search keywords written by buffer flushes")
+
+class PendingKeyword(NamedTuple):
+    id: int
+    user_id: int
+    keyword: str
+    type: int
+    created_at: datetime
+    added_at: float
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "keyword": self.keyword,
+            "type": self.type,
+            "created_at": self.created_at,
+        }
+
+class RecentSearchBuffer:
+    def __init__(self):
+        self._pending = {}
+        # flush 중인 검색어 (커밋 전까지는 조회에서 버퍼 내용으로 보여줍니다)
+        self._flushing = {}
+        self._lock = threading.Lock()
+        # flush 와 삭제가 엇갈려 지운 검색어가 다시 들어가지 않도록 DB 쓰기를 직렬화합니다.
+        self._write_lock = threading.Lock()
+        self._ids = iter(())
+        self._ids_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+        buffered_gauge.set_function(lambda: len(self._pending) + len(self._flushing))
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="recent-search-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """남은 검색어를 flush 하고 멈춥니다. 블로킹 호출이므로 async 코드에서는 asyncio.to_thread 로 부릅니다."""
+        self._stopping.set()
+        self._wakeup.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_id(self) -> int:
+        with self._ids_lock:
+            id = next(self._ids, None)
+
+            if id is None:
+                # 요청 스레드에서 불리므로 요청이 쓰는 scoped session 이 아니라 따로 커넥션을 받아 씁니다.
+                # (nextval 은 트랜잭션과 상관없이 반영되므로 커밋하지 않아도 됩니다)
+                stmt = select(func.nextval('recent_search_keywords_id_seq')).select_from(
+                    func.generate_series(1, RECENT_SEARCH_ID_BLOCK)
+                )
+
+                with database.engine.connect() as connection:
+                    self._ids = iter(connection.execute(stmt).scalars().all())
+
+                id = next(self._ids)
+
+        return id
+
+    def add(self, user_id: int, keyword: str, type: int) -> PendingKeyword:
+        entry = PendingKeyword(self._next_id(), user_id, keyword, type, datetime.now(), time.monotonic())
+
+        with self._lock:
+            # 같은 검색어는 마지막 것만 남기고 순서도 맨 뒤(가장 최근)로 옮깁니다.
+            self._pending.pop((user_id, keyword), None)
+            self._pending[(user_id, keyword)] = entry
+            size = len(self._pending)
+
+        if size >= RECENT_SEARCH_BUFFER_SIZE:
+            self._wakeup.set()
+
+        return entry
+
+    def pending_for(self, user_id: int) -> list:
+        """아직 flush 되지 않은 유저의 검색어 (최근 것부터)"""
+        with self._lock:
+            entries = {**self._flushing, **self._pending}
+
+        return sorted(
+            (entry for (entry_user_id, _), entry in entries.items() if entry_user_id == user_id),
+            key=lambda entry: entry.added_at, reverse=True
+        )
+
+    def discard(self, db: Session, user_id: int, id: int = None):
+        """
+        유저의 검색어를 버퍼와 DB 에서 지웁니다. id 가 없으면 전체를 지웁니다.
+
+        버퍼의 flush 와 겹치지 않도록 잠근 상태로 삭제를 커밋합니다.
+        """
+        with self._write_lock:
+            with self._lock:
+                for key, entry in list(self._pending.items()):
+                    if entry.user_id == user_id and (id is None or entry.id == id):
+                        del self._pending[key]
+
+            stmt = delete(database.RecentSearchKeywords).where(database.RecentSearchKeywords.user_id == user_id)
+
+            if id is not None:
+                stmt = stmt.where(database.RecentSearchKeywords.id == id)
+
+            db.execute(stmt)
+            db.commit()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(RECENT_SEARCH_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            self.flush()
+
+        self.flush()
+
+    def flush(self) -> int:
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+
+            if not batch:
+                return 0
+
+            try:
+                self._write(list(batch.values()))
+            except Exception:
+                logger.exception(f"Failed to flush {len(batch)} recent search keywords")
+                flushes_total.inc(result="error")
+
+                # 다음 주기에 다시 시도합니다. 그사이 새로 들어온 같은 검색어가 있으면 그쪽을 남깁니다.
+                with self._lock:
+                    self._pending = {**batch, **self._pending}
+                    self._flushing = {}
+
+                return 0
+
+            with self._lock:
+                self._flushing = {}
+
+        flushes_total.inc(result="success")
+        flushed_rows_total.inc(len(batch))
+
+        return len(batch)
+
+    def _write(self, entries: list):
+        now = time.monotonic()
+        # 검색한 순서를 DB 시계 기준으로 맞추기 위해 now() 에서 경과 시간만큼 뺀 값을 created_at 으로 씁니다.
+        stmt = insert(database.RecentSearchKeywords).values([
+            {
+                "id": entry.id,
+                "user_id": entry.user_id,
+                "keyword": entry.keyword,
+                "type": entry.type,
+                "created_at": func.now() - func.make_interval(0, 0, 0, 0, 0, 0, now - entry.added_at),
+            }
+            for entry in entries
+        ])
+        # 이미 있는 검색어는 새 id 로 바꿔 맨 앞으로 올립니다. (예전에 지우고 다시 넣던 것과 같은 결과)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[database.RecentSearchKeywords.user_id, database.RecentSearchKeywords.keyword],
+            set_={"id": stmt.excluded.id, "type": stmt.excluded.type, "created_at": stmt.excluded.created_at}
+        )
+
+        user_ids = list({entry.user_id for entry in entries})
+        ranked = select(
+            database.RecentSearchKeywords.id,
+            func.row_number().over(
+                partition_by=database.RecentSearchKeywords.user_id,
+                order_by=(database.RecentSearchKeywords.created_at.desc(), database.RecentSearchKeywords.id.desc())
+            ).label('recent_rank')
+        ).where(database.RecentSearchKeywords.user_id == any_(literal(user_ids, ARRAY(Integer)))).subquery()
+        trim = delete(database.RecentSearchKeywords).where(
+            database.RecentSearchKeywords.id.in_(select(ranked.c.id).where(ranked.c.recent_rank > RECENT_SEARCH_LIMIT))
+        )
+
+        db = database.session()
+
+        try:
+            db.execute(stmt)
+            db.execute(trim)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+buffer = RecentSearchBuffer()
+
+def get_recent(db: Session, user_id: int, pending: Optional[list] = None) -> list:
+    """버퍼에 남은 검색어를 앞에 붙인 유저의 최근 검색어 (최대 RECENT_SEARCH_LIMIT 개)"""
+    pending = buffer.pending_for(user_id) if pending is None else pending
+
+    stmt = select(database.RecentSearchKeywords).where(
+        database.RecentSearchKeywords.user_id == user_id
+    ).order_by(database.RecentSearchKeywords.created_at.desc()).limit(RECENT_SEARCH_LIMIT)
+    rows = db.execute(stmt).scalars().all()
+
+    keywords = {entry.keyword for entry in pending}
+    recent = [entry.as_dict() for entry in pending]
+    recent.extend(database.object_as_dict(row) for row in rows if row.keyword not in keywords)
+
+    return recent[:RECENT_SEARCH_LIMIT]
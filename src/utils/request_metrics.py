@@ -0,0 +1,139 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+import time
+
+from src.utils import metrics
+
+# 요청별 메트릭 (라우트별 지연 시간 / 상태 코드 / 응답 크기, 요청마다 DB 쿼리 수와 DB 시간)
+# 라우트 라벨은 실제 경로가 아니라 경로 템플릿(/share/item/{id})을 쓰고, 매칭되지 않은 요청은 "unmatched" 로 묶습니다.
+# DB 시간은 SQLAlchemy 커서 이벤트로 재고 contextvar 로 현재 요청에 더합니다.
+# (동기 엔드포인트는 스레드풀에서 돌지만 contextvar 가 복사되므로 같은 RequestStats 에 쌓입니다)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+response_size = metrics.histogram(
+    "http_response_size_bytes", "HTTP response body size by route", ("method", "route"), buckets=SIZE_BUCKETS
+)
+requests_in_progress = metrics.gauge("http_requests_in_progress", "HTTP requests currently being handled")
+request_db_queries = metrics.histogram(
+    "http_request_db_queries", "DB queries issued per HTTP request", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+request_db_seconds = metrics.histogram(
+    "http_request_db_seconds", "Time spent in DB queries per HTTP request", ("method", "route")
+)
+request_phase_seconds = metrics.histogram(
+    "http_request_phase_seconds", "Time spent in named phases (e.g. serialize) per HTTP request", ("method", "route", "phase")
+)
+db_query_duration = metrics.histogram("db_query_duration_seconds", "DB cursor execute latency (all queries)")
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "phases", "shapes", "slow_queries")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.phases = {}
+        # 쿼리 진단 모드에서만 채웁니다. (src/database/query_diagnostics.py)
+        self.shapes = {}
+        self.slow_queries = 0
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current() -> Optional[RequestStats]:
+    return _current.get()
+
+@contextmanager
+def phase(name: str):
+    """현재 요청에서 name 단계에 쓴 시간을 기록합니다. 요청 밖에서는 아무것도 하지 않습니다."""
+    stats = _current.get()
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        if stats is not None:
+            stats.phases[name] = stats.phases.get(name, 0.0) + time.perf_counter() - started
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started_at"].pop()
+    elapsed = time.perf_counter() - started
+
+    db_query_duration.observe(elapsed)
+
+    stats = _current.get()
+
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # 실패한 쿼리는 after_cursor_execute 가 불리지 않으므로 시작 시각만 치웁니다.
+    connection = context.connection
+
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+def route_label(scope) -> str:
+    route = scope.get("route")
+
+    return getattr(route, "path", None) or "unmatched"
+
+class RequestMetricsMiddleware:
+    """라우트별 지연 시간 / 상태 코드 / 응답 크기와 요청별 DB 쿼리 수, DB 시간을 기록하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_with_metrics(message):
+            nonlocal status, size
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+
+            await send(message)
+
+        requests_in_progress.inc()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            requests_in_progress.dec()
+            _current.reset(token)
+
+            method = scope["method"]
+            route = route_label(scope)
+
+            request_duration.observe(time.perf_counter() - started, method=method, route=route, status=status)
+            response_size.observe(size, method=method, route=route)
+            request_db_queries.observe(stats.queries, method=method, route=route)
+            request_db_seconds.observe(stats.db_seconds, method=method, route=route)
+
+            for name, seconds in stats.phases.items():
+                request_phase_seconds.observe(seconds, method=method, route=route, phase=name)
@@ -0,0 +1,73 @@
+from sqlalchemy import select, delete, update, exists, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from typing import Optional
+
+from src.database import database
+
+# 나눔 관리자 (share_admins 테이블)
+# ShareInfo.admins 문자열은 API 응답용으로 그대로 두고, 권한 확인과 "내 나눔" 조회는 이 테이블의 인덱스를 사용합니다.
+
+def parse_admins(admins: Optional[str]) -> list:
+    """"1,2, 3" -> [1, 2, 3] (빈 값/중복은 제외)"""
+    tags = []
+
+    for value in (admins or "").split(","):
+        value = value.strip()
+
+        if value.isdigit() and int(value) not in tags:
+            tags.append(int(value))
+
+    return tags
+
+def format_admins(tags: list) -> str:
+    return ",".join(map(str, tags))
+
+def admin_exists(share_id, tag: int):
+    return exists().where(database.ShareAdmins.share_id == share_id, database.ShareAdmins.user_tag == tag)
+
+def _share_with_permission_statement(share_id: int, tag: Optional[int]):
+    return select(
+        database.ShareInfo,
+        admin_exists(database.ShareInfo.id, tag).label('is_admin')
+    ).where(database.ShareInfo.id == share_id)
+
+def get_share_with_permission(db: Session, share_id: int, tag: Optional[int]) -> tuple:
+    """나눔 row 와 tag 가 그 나눔의 관리자인지를 한 번에 조회합니다. 나눔이 없으면 (None, False)."""
+    result = db.execute(_share_with_permission_statement(share_id, tag)).first()
+
+    if result is None:
+        return None, False
+
+    return result.ShareInfo, bool(result.is_admin)
+
+async def get_share_with_permission_async(db: AsyncSession, share_id: int, tag: Optional[int]) -> tuple:
+    result = (await db.execute(_share_with_permission_statement(share_id, tag))).first()
+
+    if result is None:
+        return None, False
+
+    return result.ShareInfo, bool(result.is_admin)
+
+def set_admins(db: Session, share_id: int, tags: list, update_share: bool = True) -> str:
+    """
+    나눔의 관리자 목록을 바꾸고 ShareInfo.admins 문자열도 맞춥니다. 커밋은 호출한 쪽에서 합니다.
+
+    바뀐 admins 문자열을 반환합니다.
+    """
+    admins = format_admins(tags)
+
+    db.execute(delete(database.ShareAdmins).where(database.ShareAdmins.share_id == share_id))
+
+    if tags:
+        db.execute(insert(database.ShareAdmins), [{"share_id": share_id, "user_tag": tag} for tag in tags])
+
+    if update_share:
+        db.execute(update(database.ShareInfo).where(database.ShareInfo.id == share_id).values(admins=admins))
+
+    return admins
+
+def managed_share_ids(tag: int):
+    """tag 가 관리하는 나눔 id 서브쿼리"""
+    return select(database.ShareAdmins.share_id).where(database.ShareAdmins.user_tag == tag)
@@ -0,0 +1,106 @@
+from sqlalchemy import select, update, delete, insert, values, column, any_, literal, Integer, String
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import ARRAY
+
+import logging
+
+from src.database import database
+from src.utils import share_admins, share_tile_cache, autocomplete
+
+# 나눔 여러 건 삭제 / 관리자 변경을 한 트랜잭션으로 처리합니다.
+# 삭제는 UPDATE ... WHERE id = ANY(...) 한 번, 관리자 변경은 VALUES 조인 UPDATE 한 번과 share_admins executemany 로 보냅니다.
+
+logger = logging.getLogger(__name__)
+
+DELETED = "deleted"
+UPDATED = "updated"
+NOT_FOUND = "not_found"
+ALREADY_DELETED = "already_deleted"
+INVALID_ADMINS = "invalid_admins"
+DUPLICATED = "duplicated"
+
+def _id_in(id_column, ids: list):
+    return id_column == any_(literal(ids, ARRAY(Integer)))
+
+def apply_share_changes(db: Session, deletes: list = (), admin_updates: dict = None) -> dict:
+    """
+    deletes: 삭제할 나눔 id 목록, admin_updates: {나눔 id: admins 문자열}
+
+    {나눔 id: 결과} 를 반환합니다. 중간에 실패하면 롤백하고 예외를 그대로 올립니다. (일부만 반영되지 않음)
+    """
+    admin_updates = admin_updates or {}
+    ids = list(dict.fromkeys([*deletes, *admin_updates]))
+
+    if not ids:
+        return {}
+
+    stmt = select(
+        database.ShareInfo.id, database.ShareInfo.is_deleted, database.ShareInfo.point_lat, database.ShareInfo.point_lng
+    ).where(_id_in(database.ShareInfo.id, ids))
+    rows = {row.id: row for row in db.execute(stmt).all()}
+
+    outcomes = {}
+    delete_ids = []
+    new_admins = {}
+
+    for id in deletes:
+        row = rows.get(id)
+
+        if row is None:
+            outcomes[id] = NOT_FOUND
+        elif row.is_deleted:
+            outcomes[id] = ALREADY_DELETED
+        else:
+            outcomes[id] = DELETED
+            delete_ids.append(id)
+
+    for id, admins in admin_updates.items():
+        row = rows.get(id)
+        tags = share_admins.parse_admins(admins)
+
+        if row is None:
+            outcomes[id] = NOT_FOUND
+        elif row.is_deleted or id in delete_ids:
+            outcomes[id] = ALREADY_DELETED
+        elif not tags:
+            outcomes[id] = INVALID_ADMINS
+        else:
+            outcomes[id] = UPDATED
+            new_admins[id] = tags
+
+    try:
+        if delete_ids:
+            db.execute(
+                update(database.ShareInfo)
+                .where(_id_in(database.ShareInfo.id, delete_ids))
+                .values(is_deleted=True)
+                .execution_options(synchronize_session=False)
+            )
+
+        if new_admins:
+            admin_values = values(column('id', Integer), column('admins', String), name='new_admins').data(
+                [(id, share_admins.format_admins(tags)) for id, tags in new_admins.items()]
+            )
+            db.execute(
+                update(database.ShareInfo)
+                .where(database.ShareInfo.id == admin_values.c.id)
+                .values(admins=admin_values.c.admins)
+                .execution_options(synchronize_session=False)
+            )
+
+            db.execute(delete(database.ShareAdmins).where(_id_in(database.ShareAdmins.share_id, list(new_admins))))
+            db.execute(insert(database.ShareAdmins), [
+                {"share_id": id, "user_tag": tag} for id, tags in new_admins.items() for tag in tags
+            ])
+
+        for id in [*delete_ids, *new_admins]:
+            share_tile_cache.invalidate_point(rows[id].point_lat, rows[id].point_lng, db)
+
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    autocomplete.index.remove(*delete_ids)
+
+    return outcomes
@@ -0,0 +1,86 @@
+from fastapi.responses import ORJSONResponse, StreamingResponse
+
+from sqlalchemy import func
+
+import os
+import orjson
+
+from src.database import database
+from src.utils import request_metrics
+
+# 나눔 목록 응답용 직렬화
+# 좌표는 SQL 의 ST_X/ST_Y 로 받아 GeoJSON 을 직접 만들고 (WKB -> Shapely 변환 없음),
+# jsonable_encoder 를 거치지 않고 orjson 으로 바로 bytes 를 만듭니다.
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE') or 500)
+
+def share_columns():
+    return (
+        database.ShareInfo.id,
+        database.ShareInfo.name,
+        database.ShareInfo.admins,
+        database.ShareInfo.contacts,
+        database.ShareInfo.jibun_address,
+        database.ShareInfo.doro_address,
+        database.ShareInfo.point_lat,
+        database.ShareInfo.point_lng,
+        database.ShareInfo.point_name,
+        database.ShareInfo.goods,
+        database.ShareInfo.status,
+        database.ShareInfo.version,
+        func.ST_X(database.ShareInfo.point).label('x'),
+        func.ST_Y(database.ShareInfo.point).label('y'),
+    )
+
+def point_geojson(x: float, y: float):
+    """to_shape(point).__geo_interface__ 와 같은 모양"""
+    if x is None or y is None:
+        return None
+
+    return {"type": "Point", "coordinates": [x, y]}
+
+def share_to_dict(result) -> dict:
+    """share_columns() 로 조회한 row (+ starred) 를 응답 dict 로 바꿉니다."""
+    row = {
+        "id": result.id,
+        "name": result.name,
+        "admins": result.admins,
+        "contacts": result.contacts,
+        "jibun_address": result.jibun_address,
+        "doro_address": result.doro_address,
+        "point_lat": result.point_lat,
+        "point_lng": result.point_lng,
+        "point_name": result.point_name,
+        "goods": result.goods,
+        "status": result.status,
+    }
+
+    if "starred" in result:
+        row["starred"] = result.starred
+
+    row["point"] = point_geojson(result.x, result.y)
+
+    return row
+
+def success(data, headers: dict = None, **extra) -> ORJSONResponse:
+    # JSON 인코딩 시간을 http_request_phase_seconds{phase="serialize"} 로 따로 봅니다.
+    with request_metrics.phase("serialize"):
+        return ORJSONResponse(content={"success": data, **extra}, headers=headers)
+
+def ndjson_response(stmt, batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    stmt 결과를 한 줄에 한 나눔씩 NDJSON 으로 흘려보냅니다.
+
+    서버 측 커서(yield_per)로 batch_size 개씩만 읽으므로 결과가 커져도 메모리가 늘지 않습니다.
+    요청 의존성의 세션은 응답을 보내기 전에 닫히므로 스트리밍 동안 쓸 세션을 따로 엽니다.
+    """
+    async def generate():
+        async with database.async_session() as db:
+            result = await db.stream(stmt.execution_options(yield_per=batch_size))
+
+            async for partition in result.mappings().partitions():
+                with request_metrics.phase("serialize"):
+                    chunk = b"".join(orjson.dumps(share_to_dict(row)) + b"\n" for row in partition)
+
+                yield chunk
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
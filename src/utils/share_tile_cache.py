@@ -0,0 +1,147 @@
+from sqlalchemy import select, func, or_, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from typing import NamedTuple
+
+import os
+import hashlib
+
+from src.database import database
+from src.utils import tiles, share_serializer
+from src.utils.lru_cache import TTLCache
+
+# /share/list 용 타일 캐시
+# 요청 영역을 slippy map 타일로 나눠 타일 단위로 나눔 목록을 캐시합니다.
+# 워커마다 따로 갖는 캐시이므로 다른 워커의 수정은 캐시만으로는 최대 TTL 동안 반영되지 않습니다.
+# 그래서 /share/list 는 재검증 요청(If-None-Match)일 때 get_digest() 로 DB 의 digest 와 비교해 다르면 refresh 로 다시 읽습니다.
+TILE_CACHE_SIZE = int(os.getenv('TILE_CACHE_SIZE') or 2000)
+TILE_CACHE_TTL = float(os.getenv('TILE_CACHE_TTL') or 300)
+TILE_CACHE_MIN_ZOOM = int(os.getenv('TILE_CACHE_MIN_ZOOM') or 10)
+TILE_CACHE_MAX_ZOOM = int(os.getenv('TILE_CACHE_MAX_ZOOM') or 16)
+TILE_CACHE_MAX_TILES = int(os.getenv('TILE_CACHE_MAX_TILES') or 16)
+
+tile_cache = TTLCache(TILE_CACHE_SIZE, TILE_CACHE_TTL)
+
+class SharesInBounds(NamedTuple):
+    rows: list
+    # 포함된 나눔들의 (id, version) 로 만든 값. 내용이 같으면 워커와 상관없이 같습니다. (get_digest 와 비교)
+    digest: str
+
+def _digest(versions: list) -> str:
+    return hashlib.md5(",".join(f"{id}:{version}" for id, version in versions).encode()).hexdigest()
+
+def _in_bounds(west: float, south: float, east: float, north: float):
+    return (
+        database.ShareInfo.point.ST_Intersects(func.ST_MakeEnvelope(west, south, east, north, 4326)),
+        database.ShareInfo.is_deleted == False
+    )
+
+async def get_digest(db: AsyncSession, west: float, south: float, east: float, north: float) -> str:
+    """
+    영역 안 나눔들의 (id, version) digest 를 DB 에서 바로 계산합니다. (_digest 와 같은 값)
+
+    row 를 가져오지 않지만 영역 전체를 훑으므로 재검증 요청에서만 씁니다. (워커별 캐시 상태와 상관없이 같은 값)
+    """
+    pair = func.concat(database.ShareInfo.id, ':', database.ShareInfo.version)
+    stmt = select(
+        func.md5(func.coalesce(func.string_agg(pair, aggregate_order_by(',', database.ShareInfo.id)), ''))
+    ).where(*_in_bounds(west, south, east, north))
+
+    return (await db.execute(stmt)).scalar_one()
+
+async def get_shares_in_bounds(db: AsyncSession, west: float, south: float, east: float, north: float, refresh: bool = False) -> SharesInBounds:
+    """
+    영역 안의 나눔 목록을 타일 캐시를 거쳐 반환합니다. (id 순 정렬)
+
+    영역이 너무 넓어 TILE_CACHE_MIN_ZOOM 에서도 타일 수가 많으면 캐시 없이 바로 조회합니다.
+    refresh 면 캐시를 건너뛰고 영역의 타일을 모두 다시 읽어 캐시를 덮어씁니다.
+    """
+    zoom = tiles.choose_zoom(west, south, east, north, TILE_CACHE_MIN_ZOOM, TILE_CACHE_MAX_ZOOM, TILE_CACHE_MAX_TILES)
+
+    if zoom is None:
+        stmt = select(*share_serializer.share_columns()).where(
+            *_in_bounds(west, south, east, north)
+        ).order_by(database.ShareInfo.id)
+        matched_rows = await db.execute(stmt)
+        results = matched_rows.mappings().all()
+
+        return SharesInBounds(
+            [share_serializer.share_to_dict(result) for result in results],
+            _digest([(result.id, result.version) for result in results])
+        )
+
+    tile_keys = tiles.tiles_for_bounds(west, south, east, north, zoom)
+
+    entries = []
+    missing = []
+
+    for key in tile_keys:
+        cached = None if refresh else tile_cache.get(key)
+
+        if cached is None:
+            missing.append(key)
+        else:
+            entries.extend(cached)
+
+    if missing:
+        entries.extend(await _load_tiles(db, missing))
+
+    matched = [(row["id"], version, row) for x, y, version, row in entries if west <= x <= east and south <= y <= north]
+    matched.sort(key=lambda entry: entry[0])
+
+    return SharesInBounds([row for _, _, row in matched], _digest([(id, version) for id, version, _ in matched]))
+
+async def _load_tiles(db: AsyncSession, keys: list) -> list:
+    envelopes = [func.ST_MakeEnvelope(*tiles.tile_bounds(*key), 4326) for key in keys]
+
+    stmt = select(*share_serializer.share_columns()).where(
+        or_(*[database.ShareInfo.point.ST_Intersects(envelope) for envelope in envelopes]),
+        database.ShareInfo.is_deleted == False
+    )
+    matched_rows = await db.execute(stmt)
+
+    zoom = keys[0][0]
+    buckets = {key: [] for key in keys}
+
+    for result in matched_rows.mappings().all():
+        key = (zoom, *tiles.lnglat_to_tile(result.x, result.y, zoom))
+
+        # 타일 경계에 걸친 나눔은 한 타일에만 넣습니다.
+        if key in buckets:
+            buckets[key].append((result.x, result.y, result.version, share_serializer.share_to_dict(result)))
+
+    entries = []
+
+    for key, bucket in buckets.items():
+        tile_cache.set(key, bucket)
+        entries.extend(bucket)
+
+    return entries
+
+def invalidate_point(lat: float, lng: float, db: Session = None):
+    """
+    해당 좌표가 속한 모든 줌 레벨의 타일을 캐시에서 지웁니다.
+
+    db 를 넘기면 그 세션이 커밋된 뒤에 지웁니다. 커밋 전에 지우면 다른 요청이
+    아직 바뀌지 않은 값으로 타일을 다시 채울 수 있기 때문입니다.
+    """
+    if lat is None or lng is None:
+        return
+
+    if db is not None:
+        db.info.setdefault('pending_tile_invalidations', []).append((lat, lng))
+        return
+
+    for zoom in range(TILE_CACHE_MIN_ZOOM, TILE_CACHE_MAX_ZOOM + 1):
+        tile_cache.pop((zoom, *tiles.lnglat_to_tile(lng, lat, zoom)))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_pending_after_commit(db: Session):
+    for lat, lng in db.info.pop('pending_tile_invalidations', []):
+        invalidate_point(lat, lng)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_after_rollback(db: Session):
+    db.info.pop('pending_tile_invalidations', None)
@@ -0,0 +1,12 @@
+from sqlalchemy import exists
+
+from src.database import database
+
+# 즐겨찾기 여부
+# starred_share 의 (user_id, share_id) 유니크 인덱스를 타므로 나눔 한 건당 한 번만 확인합니다.
+
+def is_starred(user_id: int):
+    return exists().where(
+        database.StarredShare.user_id == user_id,
+        database.StarredShare.share_id == database.ShareInfo.id
+    )
@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+import asyncio
+import logging
+import time
+
+from src.aws.secretManager import get_secret
+from src.utils import metrics
+
+# 기동 단계별 소요 시간
+# lifespan 에서 phase() 로 감싼 단계의 시간을 기록하고 /internal/startup 과 로그로 내보냅니다.
+logger = logging.getLogger(__name__)
+
+phase_seconds = metrics.gauge("startup_phase_seconds", "Seconds spent in each startup phase", ("phase",))
+
+timings = {}
+
+def record(name: str, seconds: float):
+    timings[name] = round(seconds, 4)
+    phase_seconds.set(seconds, phase=name)
+
+@contextmanager
+def phase(name: str):
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+async def prefetch_secrets(required: tuple = (), optional: tuple = ()) -> dict:
+    """
+    시크릿을 동시에 조회해 캐시에 채웁니다. {이름: 값} 을 반환합니다.
+
+    required 중 하나라도 실패하면 예외를 올리고, optional 은 경고만 남기고 처음 쓸 때 다시 조회합니다.
+    """
+    names = [*required, *optional]
+    results = await asyncio.gather(*[asyncio.to_thread(get_secret, name) for name in names], return_exceptions=True)
+    secrets = {}
+
+    for name, result in zip(names, results):
+        if not isinstance(result, Exception):
+            secrets[name] = result
+        elif name in required:
+            raise result
+        else:
+            logger.warning(f"Failed to prefetch secret: {name} ({result!r})")
+
+    return secrets
+
+def report():
+    logger.info("Startup timings: " + ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in timings.items()))
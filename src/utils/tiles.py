@@ -0,0 +1,48 @@
+import math
+
+# slippy map (z/x/y) 타일 계산 함수들
+
+MAX_LATITUDE = 85.05112878
+
+def lnglat_to_tile(lng: float, lat: float, zoom: int) -> tuple:
+    """경위도가 속한 타일의 (x, y) 를 반환합니다."""
+    n = 2 ** zoom
+    lat = max(-MAX_LATITUDE, min(MAX_LATITUDE, lat))
+    lat_rad = math.radians(lat)
+
+    x = int((lng + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * n)
+
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(zoom: int, x: int, y: int) -> tuple:
+    """타일의 (west, south, east, north) 경위도를 반환합니다."""
+    n = 2 ** zoom
+
+    west = x / n * 360.0 - 180.0
+    east = (x + 1) / n * 360.0 - 180.0
+    north = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    south = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+
+    return west, south, east, north
+
+def tiles_for_bounds(west: float, south: float, east: float, north: float, zoom: int) -> list:
+    """영역을 덮는 타일 (zoom, x, y) 목록을 반환합니다."""
+    min_x, min_y = lnglat_to_tile(west, north, zoom)
+    max_x, max_y = lnglat_to_tile(east, south, zoom)
+
+    return [(zoom, x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+def count_tiles(west: float, south: float, east: float, north: float, zoom: int) -> int:
+    min_x, min_y = lnglat_to_tile(west, north, zoom)
+    max_x, max_y = lnglat_to_tile(east, south, zoom)
+
+    return (max_x - min_x + 1) * (max_y - min_y + 1)
+
+def choose_zoom(west: float, south: float, east: float, north: float, min_zoom: int, max_zoom: int, max_tiles: int):
+    """영역을 max_tiles 개 이하의 타일로 덮을 수 있는 가장 높은 줌을 반환합니다. 없으면 None."""
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        if count_tiles(west, south, east, north, zoom) <= max_tiles:
+            return zoom
+
+    return None
@@ -0,0 +1,104 @@
+from fastapi import Request
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from typing import NamedTuple, Optional
+
+import os
+
+from src.database import database
+from src.utils.lru_cache import TTLCache
+
+# 로그인 토큰 -> (user_id, tag) 캐시
+# 워커마다 따로 갖는 캐시이므로 다른 워커에서 삭제된 토큰(로그아웃 / 비밀번호 변경)은 최대 TTL 동안 유효하게 보일 수 있습니다.
+# 그래서 TTL 은 짧게 두고, 비밀번호 변경 / 회원 탈퇴 / 어드민 변경처럼 민감한 요청은 fresh=True 로 항상 DB 를 확인합니다.
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE') or 10000)
+TOKEN_CACHE_TTL = float(os.getenv('TOKEN_CACHE_TTL') or 5)
+
+token_cache = TTLCache(TOKEN_CACHE_SIZE, TOKEN_CACHE_TTL)
+
+class TokenInfo(NamedTuple):
+    user_id: int
+    tag: Optional[int]
+
+def _token_statement(auth_token: str):
+    return (
+        select(database.LoginToken.user_id, database.Users.tag)
+        .outerjoin(database.Users, database.Users.id == database.LoginToken.user_id)
+        .where(database.LoginToken.token == auth_token)
+    )
+
+def _get_memo(request: Optional[Request]) -> Optional[dict]:
+    if request is None:
+        return None
+
+    memo = getattr(request.state, 'resolved_tokens', None)
+
+    if memo is None:
+        memo = {}
+        request.state.resolved_tokens = memo
+
+    return memo
+
+def _to_info(auth_token: str, row) -> Optional[TokenInfo]:
+    if row is None:
+        token_cache.pop(auth_token)
+        return None
+
+    info = TokenInfo(user_id=row.user_id, tag=row.tag)
+    token_cache.set(auth_token, info)
+
+    return info
+
+def resolve_token(auth_token: str, db: Session, request: Request = None, fresh: bool = False) -> Optional[TokenInfo]:
+    """
+    로그인 토큰에 해당하는 유저 정보를 반환합니다. 없으면 None.
+
+    같은 요청 안에서는 request.state 에 기억한 값을, 그 다음으로 프로세스 캐시를 사용합니다.
+    fresh 면 둘 다 건너뛰고 DB 에서 확인한 값으로 다시 채웁니다.
+    """
+    if auth_token is None:
+        return None
+
+    memo = _get_memo(request)
+
+    if not fresh and memo is not None and auth_token in memo:
+        return memo[auth_token]
+
+    info = None if fresh else token_cache.get(auth_token)
+
+    if info is None:
+        info = _to_info(auth_token, db.execute(_token_statement(auth_token)).first())
+
+    if memo is not None:
+        memo[auth_token] = info
+
+    return info
+
+async def resolve_token_async(auth_token: str, db: AsyncSession, request: Request = None, fresh: bool = False) -> Optional[TokenInfo]:
+    if auth_token is None:
+        return None
+
+    memo = _get_memo(request)
+
+    if not fresh and memo is not None and auth_token in memo:
+        return memo[auth_token]
+
+    info = None if fresh else token_cache.get(auth_token)
+
+    if info is None:
+        info = _to_info(auth_token, (await db.execute(_token_statement(auth_token))).first())
+
+    if memo is not None:
+        memo[auth_token] = info
+
+    return info
+
+def invalidate_token(auth_token: str):
+    token_cache.pop(auth_token)
+
+def invalidate_user(user_id: int):
+    """해당 유저의 토큰을 캐시에서 모두 지웁니다."""
+    token_cache.remove_where(lambda token, info: info.user_id == user_id)
@@ -0,0 +1,129 @@
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+from collections import defaultdict
+
+import asyncio
+import logging
+import os
+import orjson
+
+from src.utils import metrics
+
+# 이메일 인증 알림 허브
+# 가입 화면은 /verify/email/ws/{token} 으로 웹소켓을 열어 두고 기다리며,
+# 인증이 끝나면 같은 프로세스 안에서 토큰으로 찾아 바로 알림을 보냅니다. (요청마다 외부 소켓 서버에 연결하지 않음)
+# 프로세스 안의 구독 목록이므로 uvicorn 워커를 여러 개 띄우면 같은 워커에 연결된 화면에만 전달됩니다.
+VERIFY_WS_TIMEOUT = float(os.getenv('VERIFY_WS_TIMEOUT') or 900)
+VERIFY_WS_SEND_TIMEOUT = float(os.getenv('VERIFY_WS_SEND_TIMEOUT') or 5)
+
+logger = logging.getLogger(__name__)
+
+waiting_gauge = metrics.gauge("verify_ws_waiting", "WebSocket sessions waiting for an email verification event")
+published_total = metrics.counter("verify_ws_published_total", "Verification events published to the hub")
+delivered_total = metrics.counter("verify_ws_delivered_total", "Verification events delivered to waiting sessions")
+
+class VerifyHub:
+    def __init__(self):
+        self._waiting = defaultdict(set)
+        self._loop = None
+
+        waiting_gauge.set_function(lambda: sum(len(sockets) for sockets in list(self._waiting.values())))
+
+    def is_waiting(self, token: str) -> bool:
+        return token in self._waiting
+
+    def subscribe(self, token: str, websocket: WebSocket):
+        self._loop = asyncio.get_running_loop()
+        self._waiting[token].add(websocket)
+
+    def unsubscribe(self, token: str, websocket: WebSocket):
+        sockets = self._waiting.get(token)
+
+        if sockets is None:
+            return
+
+        sockets.discard(websocket)
+
+        if not sockets:
+            del self._waiting[token]
+
+    async def wait(self, websocket: WebSocket, token: str, check=None):
+        """
+        연결을 받아 token 의 알림을 기다립니다. 알림을 받거나 VERIFY_WS_TIMEOUT 이 지나거나 클라이언트가 끊으면 돌아옵니다.
+
+        check 는 구독한 뒤에 한 번 부르는 코루틴 함수로, 연결하기 전에 이미 인증된 경우의 메시지를 돌려줍니다.
+        """
+        await websocket.accept()
+        self.subscribe(token, websocket)
+
+        try:
+            if check is not None:
+                message = await check()
+
+                if message is not None:
+                    await self._send(websocket, orjson.dumps(message).decode())
+                    return
+
+            try:
+                await asyncio.wait_for(self._drain(websocket), VERIFY_WS_TIMEOUT)
+            except asyncio.TimeoutError:
+                await self._close(websocket)
+        finally:
+            self.unsubscribe(token, websocket)
+
+    async def _drain(self, websocket: WebSocket):
+        # 클라이언트가 보내는 메시지는 무시하고 끊길 때까지 기다립니다.
+        while True:
+            message = await websocket.receive()
+
+            if message["type"] == "websocket.disconnect":
+                return
+
+    async def publish(self, token: str, message: dict) -> int:
+        """token 을 기다리는 모든 연결에 message 를 보내고 연결을 닫습니다. 전달한 연결 수를 반환합니다."""
+        sockets = list(self._waiting.pop(token, ()))
+        published_total.inc()
+
+        if not sockets:
+            return 0
+
+        data = orjson.dumps(message).decode()
+        results = await asyncio.gather(*[self._send(websocket, data) for websocket in sockets])
+        delivered = sum(results)
+        delivered_total.inc(delivered)
+
+        return delivered
+
+    def publish_threadsafe(self, token: str, message: dict) -> bool:
+        """동기 엔드포인트(스레드풀)에서 부릅니다. 기다리는 연결이 없으면 아무것도 하지 않고 False."""
+        loop = self._loop
+
+        if loop is None or loop.is_closed() or not self.is_waiting(token):
+            return False
+
+        asyncio.run_coroutine_threadsafe(self.publish(token, message), loop)
+
+        return True
+
+    async def _send(self, websocket: WebSocket, data: str) -> bool:
+        try:
+            await asyncio.wait_for(websocket.send_text(data), VERIFY_WS_SEND_TIMEOUT)
+        except Exception:
+            logger.debug("Failed to deliver verification event", exc_info=True)
+            return False
+        finally:
+            await self._close(websocket)
+
+        return True
+
+    async def _close(self, websocket: WebSocket):
+        if websocket.application_state != WebSocketState.CONNECTED:
+            return
+
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+hub = VerifyHub()
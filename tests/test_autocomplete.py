@@ -0,0 +1,123 @@
+import threading
+
+from src.utils import autocomplete
+from src.utils.autocomplete import AutocompleteIndex, ShareEntry, get_choseong
+
+
+def make_index(*names):
+    index = AutocompleteIndex()
+
+    for id, name in enumerate(names, start=1):
+        index.upsert(id, name, None, None, 37.5, 127.0)
+
+    return index
+
+
+def names(entries):
+    return [entry.name for entry in entries]
+
+
+def test_get_choseong():
+    assert get_choseong('나') == 'ㄴ'
+    assert get_choseong('눔') == 'ㄴ'
+    assert get_choseong('까') == 'ㄲ'
+    assert get_choseong('a') == 'a'
+
+
+def test_choseong_query_matches_syllables():
+    index = make_index('나눔 냉장고', '공유 책장')
+
+    assert names(index.search('ㄴㄴ')) == ['나눔 냉장고']
+    assert names(index.search('ㄱㅇ')) == ['공유 책장']
+    assert index.search('ㅊㄴ') == []
+
+
+def test_last_syllable_without_jongseong_matches_while_typing():
+    index = make_index('나눔 냉장고')
+
+    assert names(index.search('나누')) == ['나눔 냉장고']
+    assert names(index.search('나눔')) == ['나눔 냉장고']
+    # 받침이 빠진 글자는 마지막 글자일 때만 허용합니다.
+    assert index.search('나누 냉') == []
+
+
+def test_mixed_syllable_and_choseong():
+    index = make_index('나눔 냉장고', '나무 의자')
+
+    assert names(index.search('나ㄴ')) == ['나눔 냉장고']
+
+
+def test_prefix_match_comes_first():
+    index = make_index('우리 동네 나눔', '나눔 가게', '나눔')
+
+    assert names(index.search('나눔')) == ['나눔', '나눔 가게', '우리 동네 나눔']
+
+
+def test_search_is_case_insensitive_and_trims():
+    index = make_index('Free Books')
+
+    assert names(index.search('  free ')) == ['Free Books']
+    assert index.search('   ') == []
+
+
+def test_bounds_filter():
+    index = AutocompleteIndex()
+    index.upsert(1, '나눔 서울', None, None, 37.5, 127.0)
+    index.upsert(2, '나눔 부산', None, None, 35.1, 129.0)
+
+    assert names(index.search('나눔', bounds=(126.0, 37.0, 128.0, 38.0))) == ['나눔 서울']
+
+
+def test_update_and_remove():
+    index = make_index('나눔 냉장고')
+
+    index.update(1, name='공유 냉장고')
+    assert index.search('나눔') == []
+    assert names(index.search('ㄱㅇ')) == ['공유 냉장고']
+
+    index.remove(1)
+    assert index.search('냉장고') == []
+
+
+def test_match_position():
+    entry = ShareEntry(1, '우리 나눔', None, None, None, None)
+
+    assert entry.match_position('ㄴㄴ') == 3
+    assert entry.match_position('우리') == 0
+    assert entry.match_position('없음') == -1
+
+
+def test_changes_during_rebuild_survive_swap(monkeypatch):
+    index = make_index('예전 나눔')
+    queried = threading.Event()
+    resume = threading.Event()
+
+    class Result:
+        def all(self):
+            queried.set()
+            resume.wait(5)
+            return [(1, '예전 나눔', None, None, 37.5, 127.0), (2, '지울 나눔', None, None, 37.5, 127.0)]
+
+    class Session:
+        def execute(self, stmt):
+            return Result()
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(autocomplete.database, 'session', Session)
+
+    thread = threading.Thread(target=index.rebuild)
+    thread.start()
+    assert queried.wait(5)
+
+    # 조회가 끝난 뒤 교체 전까지 들어온 변경
+    index.upsert(3, '새 나눔', None, None, 37.5, 127.0)
+    index.update(1, name='바뀐 나눔')
+    index.remove(2)
+
+    resume.set()
+    thread.join(5)
+
+    assert index.ready
+    assert sorted(names(index.search('나눔'))) == ['바뀐 나눔', '새 나눔']
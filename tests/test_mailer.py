@@ -0,0 +1,145 @@
+import socket
+import time
+
+import pytest
+
+from aiosmtpd.controller import Controller
+
+from src.utils import mailer as mailer_module
+from src.utils.mailer import Mailer
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.servers = []
+        self.drop_next_data = False
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.drop_next_data:
+            # 메일을 받는 도중 서버가 연결을 끊은 경우
+            self.drop_next_data = False
+            server.transport.close()
+            return "421 closing connection"
+
+        if server not in self.servers:
+            self.servers.append(server)
+
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(predicate, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+
+        time.sleep(0.01)
+
+    return predicate()
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+
+    # python -m aiosmtpd 로 띄운 로컬 디버그 서버와 같은 설정
+    monkeypatch.setattr(mailer_module, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(mailer_module, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(mailer_module, "SMTP_SSL", False)
+    monkeypatch.setattr(mailer_module, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(mailer_module, "SMTP_AUTH", False)
+    monkeypatch.setattr(mailer_module, "MAIL_RATE_PER_SECOND", 1000)
+    monkeypatch.setattr(mailer_module, "MAIL_RETRY_BASE_DELAY", 0.05)
+    monkeypatch.setattr(mailer_module, "get_secret", lambda name: {"email": "sender@nanumsa.com"})
+
+    yield controller, handler
+
+    controller.stop()
+
+
+@pytest.fixture
+def mailer():
+    instance = Mailer()
+
+    yield instance
+
+    instance.stop(timeout=5)
+
+
+def test_queued_mail_is_delivered(smtp_server, mailer):
+    _, handler = smtp_server
+
+    assert mailer.send("user@example.com", "인증 메일", "<p>hello</p>")
+    assert wait_for(lambda: len(handler.messages) == 1)
+
+    rcpt_tos, content = handler.messages[0]
+    assert rcpt_tos == ["user@example.com"]
+    assert "From: sender@nanumsa.com" in content
+
+
+def test_messages_reuse_one_connection(smtp_server, mailer):
+    _, handler = smtp_server
+    connects = mailer_module.connects_total.get()
+
+    for i in range(5):
+        assert mailer.send(f"user{i}@example.com", "subject", "<p>hello</p>")
+
+    assert wait_for(lambda: len(handler.messages) == 5)
+    assert len(handler.servers) == 1
+    assert mailer_module.connects_total.get() - connects == 1
+
+
+def test_retries_after_connection_dropped_while_idle(smtp_server, mailer):
+    controller, handler = smtp_server
+
+    assert mailer.send("first@example.com", "subject", "<p>hello</p>")
+    assert wait_for(lambda: len(handler.messages) == 1)
+
+    # 서버가 쉬고 있는 연결을 먼저 끊습니다.
+    controller.loop.call_soon_threadsafe(handler.servers[0].transport.close)
+    assert wait_for(lambda: handler.servers[0].transport is None)
+
+    retries = mailer_module.retries_total.get()
+
+    assert mailer.send("second@example.com", "subject", "<p>hello</p>")
+    assert wait_for(lambda: len(handler.messages) == 2)
+    assert handler.messages[1][0] == ["second@example.com"]
+    assert len(handler.servers) == 2
+    assert mailer_module.retries_total.get() - retries == 1
+
+
+def test_retries_after_connection_dropped_during_send(smtp_server, mailer):
+    _, handler = smtp_server
+    handler.drop_next_data = True
+    retries = mailer_module.retries_total.get()
+
+    assert mailer.send("user@example.com", "subject", "<p>hello</p>")
+    assert wait_for(lambda: len(handler.messages) == 1)
+    assert handler.messages[0][0] == ["user@example.com"]
+    assert mailer_module.retries_total.get() - retries == 1
+
+
+def test_stop_drains_queue_and_closes_connection(smtp_server, monkeypatch):
+    _, handler = smtp_server
+    monkeypatch.setattr(mailer_module, "MAIL_RATE_PER_SECOND", 50)
+    mailer = Mailer()
+
+    for i in range(10):
+        assert mailer.send(f"user{i}@example.com", "subject", "<p>hello</p>")
+
+    mailer.stop(timeout=5)
+
+    assert len(handler.messages) == 10
+    assert not mailer._thread.is_alive()
+    assert mailer._server is None
@@ -0,0 +1,34 @@
+import base64
+import json
+
+import pytest
+
+from src.utils.pagination import decode_cursor, encode_cursor
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_round_trip():
+    assert decode_cursor(encode_cursor(0.42, 17), (float, int)) == (0.42, 17)
+
+
+def test_integer_similarity_is_accepted_as_float():
+    assert decode_cursor(raw_cursor([1, 3]), (float, int)) == (1.0, 3)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    raw_cursor({"a": 1}),
+    raw_cursor([0.5]),
+    raw_cursor(["x", {}]),
+    raw_cursor([0.5, "3"]),
+    raw_cursor([0.5, 3.5]),
+    raw_cursor([True, 3]),
+    raw_cursor([0.5, False]),
+    raw_cursor([None, 3]),
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, (float, int))
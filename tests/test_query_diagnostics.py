@@ -0,0 +1,41 @@
+import pytest
+
+from src.database.query_diagnostics import format_parameters, is_read_only, statement_shape
+
+
+def test_named_parameters_are_masked_by_name():
+    formatted = format_parameters({"email_1": "a@b.c", "password_1": "hash", "token_1": "abc", "id_1": 3})
+
+    assert "a@b.c" not in formatted
+    assert "hash" not in formatted
+    assert "abc" not in formatted
+    assert "'id_1': 3" in formatted
+
+
+def test_positional_parameters_log_only_types():
+    formatted = format_parameters(("secret-token", 3, None))
+
+    assert formatted == "(str, int, NoneType)"
+
+
+def test_executemany_logs_only_count():
+    assert format_parameters([{"token": "a"}, {"token": "b"}], executemany=True) == "<2 parameter sets>"
+
+
+@pytest.mark.parametrize("statement, expected", [
+    ("SELECT * FROM share_info WHERE id = $1", True),
+    ("  select id from users", True),
+    ("SELECT nextval('recent_search_keywords_id_seq') FROM generate_series(1, 100)", False),
+    ("SELECT * FROM share_info WHERE id = $1 FOR UPDATE", False),
+    ("SELECT * FROM share_info FOR NO KEY UPDATE", False),
+    ("SELECT * FROM share_info FOR KEY SHARE", False),
+    ("UPDATE share_info SET name = $1", False),
+    ("WITH d AS (DELETE FROM t RETURNING id) SELECT * FROM d", False),
+])
+def test_is_read_only(statement, expected):
+    assert is_read_only(statement) is expected
+
+
+def test_statement_shape_folds_in_lists_and_whitespace():
+    assert statement_shape("SELECT a\n  FROM t WHERE id IN (%(id_1_1)s, %(id_1_2)s)") == "SELECT a FROM t WHERE id IN (?)"
+    assert statement_shape("SELECT a FROM t WHERE id IN ($1, $2, $3)") == statement_shape("SELECT a FROM t WHERE id IN ($1)")